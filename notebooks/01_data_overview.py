@@ -1,41 +1,39 @@
-import pandas as pd
-import matplotlib.pyplot as plt
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))  # run directly or by src/pipeline.py
+from config import RAW_DATA, VISUALS_DIR
+from storage import read_raw_csv
+from rollup_cube import RollupCube
+from chart_renderer import chart, render_charts
 
-df = pd.read_csv('/Users/shoaibhassan/Desktop/AI/PythonProjects/crime-data-analysis-&-hotspot-detection/data-raw/karachi_crime_2020_2025.csv')
+df = read_raw_csv(RAW_DATA)
 
 # First few rows
 df.head()
 df.info()
 
-# Check distribution of categorical columns
-df['SEVERITY'].value_counts()
-df['CRIME_TYPE'].value_counts() 
-df['TOWN'].value_counts()
-df['SUBDIVISION'].value_counts()
+# Check distribution of categorical columns (one counting pass over the raw data)
+cube = RollupCube.from_frame(df, dimensions=['SEVERITY', 'CRIME_TYPE', 'TOWN'], marginals=['SUBDIVISION'])
+cube.value_counts('SEVERITY')
+cube.value_counts('CRIME_TYPE')
+cube.value_counts('TOWN')
+cube.value_counts('SUBDIVISION')
 
 # Summary statistics for numerical columns
 df[['SEVERITY_SCORE','LATITUDE','LONGITUDE']].describe()
 
-# Function to plot and save bar charts
-def plot_and_save(series, title, xlabel, ylabel, filename, top_n=None, figsize=(12,6)):
-    data = series.value_counts()
+# Bar chart spec for a column's counts (charts are rendered headless, in parallel, and skipped when unchanged)
+def bar_chart(column, title, xlabel, ylabel, filename, top_n=None, figsize=(12,6)):
+    data = cube.value_counts(column)
     if top_n:
         data = data.head(top_n)
-    plt.figure(figsize=figsize)
-    data.plot(kind='bar')
-    plt.title(title)
-    plt.xlabel(xlabel)
-    plt.ylabel(ylabel)
-    plt.xticks(rotation=45, horizontalalignment='right')
-    plt.tight_layout()
-    plt.savefig(f'/Users/shoaibhassan/Desktop/AI/PythonProjects/crime-data-analysis-&-hotspot-detection/visuals/{filename}', bbox_inches='tight')
-    plt.show()
+    return chart('bar', data.reset_index(), filename, title, xlabel, ylabel, x=column, y='count', figsize=figsize, xtick_rotation=45)
 
 # Plotting
-plot_and_save(df['SEVERITY'], 'Severity Distribution', 'Severity', 'Count', '01_01_severity_distribution.png', figsize=(8,6))
-
-plot_and_save(df['CRIME_TYPE'], 'Crime Type Distribution', 'Crime Type', 'Count', '01_02_crime_type_distribution.png', figsize=(12,6))
-
-plot_and_save(df['TOWN'], 'Crime Distribution by Town', 'Town', 'Number of Crimes', '01_03_crime_by_town.png')
-
-plot_and_save(df['SUBDIVISION'], 'Top 20 Subdivisions by Crime Count', 'Subdivision', 'Number of Crimes', '01_04_crime_by_subdivision.png', top_n=20)
+charts = [
+    bar_chart('SEVERITY', 'Severity Distribution', 'Severity', 'Count', '01_01_severity_distribution.png', figsize=(8,6)),
+    bar_chart('CRIME_TYPE', 'Crime Type Distribution', 'Crime Type', 'Count', '01_02_crime_type_distribution.png', figsize=(12,6)),
+    bar_chart('TOWN', 'Crime Distribution by Town', 'Town', 'Number of Crimes', '01_03_crime_by_town.png'),
+    bar_chart('SUBDIVISION', 'Top 20 Subdivisions by Crime Count', 'Subdivision', 'Number of Crimes', '01_04_crime_by_subdivision.png', top_n=20),
+]
+print(render_charts(charts, VISUALS_DIR))
@@ -1,31 +1,27 @@
-import pandas as pd
-from sklearn.preprocessing import LabelEncoder
-from sklearn.preprocessing import OneHotEncoder
-from sklearn.preprocessing import StandardScaler
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))  # run directly or by src/pipeline.py
+from config import RAW_DATA, CLEANED, LABEL_ENCODED, ONE_HOT, ONE_HOT_SPARSE, ROLLUP_CUBE, FEATURE_STORE
+from storage import read_artifact, write_artifact, write_sparse_artifact
+from streaming_preprocessing import preprocess_csv_in_chunks
+from feature_store import DERIVED_FEATURES, TEMPORAL_FEATURES, FeatureStore
+from feature_encoding import DROPPED_COLUMNS, SCALED_COLUMNS, encode_features
+from rollup_cube import RollupCube
+
+SPARSE_ONE_HOT = True  # keep the one-hot block as a CSR matrix instead of ~dense zero columns
 
 # -----------------------------
-# Load the Dataset
+# Load the Dataset, Handle Missing Values & Duplicates, Correct Data Types
 # -----------------------------
-df = pd.read_csv('/Users/shoaibhassan/Desktop/AI/PythonProjects/crime-data-analysis-&-hotspot-detection/data-raw/karachi_crime_2020_2025.csv')
+# The raw CSV is cleaned chunk by chunk, so peak memory is set by the chunk size instead of the file size:
+# rows with missing values and duplicate rows are dropped, DATE becomes a datetime and the categorical
+# columns are dictionary-encoded. Only the cleaned Parquet is loaded.
+cleaning_stats = preprocess_csv_in_chunks(RAW_DATA, CLEANED)
+print(cleaning_stats) # rows read / dropped (missing, duplicates) / written
 
-# -----------------------------
-# Handle Missing Values & Duplicates
-# -----------------------------
-df.isnull().sum() #check missing values
-df = df.dropna() #remove rows with missing values
-df.duplicated().sum() #check duplicates
-df = df.drop_duplicates() # remove duplicates
-
-# -----------------------------
-# Correct Data Types
-# -----------------------------
+df = read_artifact(CLEANED) # categorical columns come back as 'category'
 df.dtypes
-
-df['DATE'] = pd.to_datetime(df['DATE'], format='%Y-%m-%d', errors='coerce') # Change DATE from text (object) to a proper datetime format
 df['DATE'].dtype
-
-categorical_cols = ['TOWN', 'TOWN_RISK_LEVEL', 'SUBDIVISION', 'SUBDIVISION_RISK_LEVEL', 'CRIME_TYPE', 'SEVERITY', 'RISK_ZONE', 'SOURCE']
-df[categorical_cols] = df[categorical_cols].astype('category') # Mark categorical columns as categorical
 df.info()
 
 numeric_cols = df.select_dtypes(include=['int64', 'float64']).columns # Verify numeric columns
@@ -34,72 +30,44 @@ print("Numeric columns:", numeric_cols)
 # -----------------------------
 # Feature Engineering
 # -----------------------------
-# Derive temporal features from DATE
-df['HOUR'] = df['DATE'].dt.hour
-df['DAY_OF_WEEK'] = df['DATE'].dt.dayofweek
-df['MONTH'] = df['DATE'].dt.month
-df['YEAR'] = df['DATE'].dt.year
-df['IS_PEAK_HOUR'] = df['HOUR'].apply(lambda x: 1 if 17 <= x <= 20 else 0) # Define peak hours as 5 PM to 8 PM
-df['IS_WEEKEND'] = df['DAY_OF_WEEK'].apply(lambda x: 1 if x >= 5 else 0) # Define weekend as Saturday (5) and Sunday (6)
-df[['HOUR', 'DAY_OF_WEEK', 'MONTH', 'YEAR', 'IS_PEAK_HOUR', 'IS_WEEKEND']].head(10)
+# Temporal features derived from DATE and HOUR (DAY_OF_WEEK, MONTH, YEAR, IS_PEAK_HOUR, IS_WEEKEND) live in the
+# feature store, keyed by INCIDENT_ID: only incidents it has not seen before get them computed, and the
+# stages that need them (the cube below, 03, 04, the warehouse load) read them with attach()
+feature_store = FeatureStore(FEATURE_STORE)
+print("Incidents added to the feature store:", feature_store.update(df))
+incidents = feature_store.attach(df, DERIVED_FEATURES)
+incidents[TEMPORAL_FEATURES].head(10)
 
-# save the cleaned dataset
-df.to_csv('/Users/shoaibhassan/Desktop/AI/PythonProjects/crime-data-analysis-&-hotspot-detection/data-processed/02_01_karachi_crime_2020_2025_cleaned.csv', index=False)
+# Count cube (year x month x day x hour x crime type x town x severity) for the trend reports in 05
+RollupCube.from_frame(incidents).save(ROLLUP_CUBE)
+del incidents
 
-df = df.drop(columns=['INCIDENT_ID', 'SOURCE', 'SEVERITY', 'RISK_ZONE']) # Drop unnecessary columns
+df = df.drop(columns=DROPPED_COLUMNS) # Drop unnecessary columns
 
 df.isnull().sum()
 df.describe()
 
 # -----------------------------
-# Encode Categorical Variables
+# Encode Categorical Variables & Scale Numeric Features
 # -----------------------------
-cat_cols = ['TOWN', 'TOWN_RISK_LEVEL', 'SUBDIVISION', 'SUBDIVISION_RISK_LEVEL', 'CRIME_TYPE']
-
-# Label encoding
-le_df = df.copy()
-le = LabelEncoder()
-for col in cat_cols:
-    le_df[col] = le.fit_transform(le_df[col])
+# Label encoding, one-hot encoding (for KMeans clustering) and standard scaling of
+# TOWN_PRIORITY_RANK, SUBDIVISION_PRIORITY_RANK, SEVERITY_SCORE, LATITUDE and LONGITUDE;
+# the scale benchmark times this same function
+le_df, df, ohe_encoded, ohe_columns = encode_features(df, sparse_one_hot=SPARSE_ONE_HOT)
 le_df.head()
-
-# One-hot encoding (if needed for KMeans clustering)
-ohe = OneHotEncoder(sparse_output=False, handle_unknown='ignore')
-ohe_encoded = ohe.fit_transform(df[cat_cols])
-
-# Convert the encoded array to a DataFrame
-encoded_df = pd.DataFrame(
-    ohe_encoded, 
-    columns=ohe.get_feature_names_out(cat_cols),
-    index=df.index
-)
-df = df.drop(columns=cat_cols) # Drop original categorical columns
-df = pd.concat([df, encoded_df], axis=1) # Concatenate the one-hot encoded columns
 df.head()
 
-# -----------------------------
-# Scale Numeric Features
-# -----------------------------
-numeric_cols_to_scale = [
-    'TOWN_PRIORITY_RANK', 
-    'SUBDIVISION_PRIORITY_RANK', 
-    'SEVERITY_SCORE', 
-    'LATITUDE', 
-    'LONGITUDE'
-]
-
-scaler = StandardScaler()
-le_df[numeric_cols_to_scale] = scaler.fit_transform(le_df[numeric_cols_to_scale]) # scale label encoded numeric columns
-df[numeric_cols_to_scale] = scaler.fit_transform(df[numeric_cols_to_scale]) # scale one-hot encoded numeric columns
-
 # Verify scaling
-le_df[numeric_cols_to_scale].mean()
-le_df[numeric_cols_to_scale].std()
-df[numeric_cols_to_scale].mean()
-df[numeric_cols_to_scale].std()
+le_df[SCALED_COLUMNS].mean()
+le_df[SCALED_COLUMNS].std()
+df[SCALED_COLUMNS].mean()
+df[SCALED_COLUMNS].std()
 
 # -----------------------------
 # Save Preprocessed Dataset
 # -----------------------------
-df.to_csv('/Users/shoaibhassan/Desktop/AI/PythonProjects/crime-data-analysis-&-hotspot-detection/data-processed/02_02_karachi_crime_2020_2025_label_encoded.csv', index=False)
-le_df.to_csv('/Users/shoaibhassan/Desktop/AI/PythonProjects/crime-data-analysis-&-hotspot-detection/data-processed/02_03_karachi_crime_2020_2025_label_encoded.csv', index=False)
\ No newline at end of file
+write_artifact(le_df, LABEL_ENCODED)
+write_artifact(df, ONE_HOT)
+if SPARSE_ONE_HOT:
+    # one-hot block lives next to the dense columns; storage.load_feature_matrix joins them as one CSR matrix
+    write_sparse_artifact(ohe_encoded, ohe_columns, ONE_HOT_SPARSE)
\ No newline at end of file
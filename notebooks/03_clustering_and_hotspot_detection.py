@@ -1,11 +1,25 @@
+import numpy as np
 import pandas as pd
+import scipy.sparse as sp
 from sklearn.cluster import KMeans
-from sklearn.metrics import silhouette_score
-import matplotlib.pyplot as plt
-
-df = pd.read_csv('/Users/shoaibhassan/Desktop/AI/PythonProjects/crime-data-analysis-&-hotspot-detection/data-processed/02_03_karachi_crime_2020_2025_one_hot_encoded.csv')
-le_df = pd.read_csv('/Users/shoaibhassan/Desktop/AI/PythonProjects/crime-data-analysis-&-hotspot-detection/data-processed/02_02_karachi_crime_2020_2025_label_encoded.csv')
-raw_df = pd.read_csv('/Users/shoaibhassan/Desktop/AI/PythonProjects/crime-data-analysis-&-hotspot-detection/data-processed/02_01_karachi_crime_2020_2025_cleaned.csv')
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))  # run directly or by src/pipeline.py
+from config import CLEANED, FEATURE_STORE, LABEL_ENCODED, ONE_HOT, ONE_HOT_SPARSE, WITH_CLUSTERS, CLUSTER_SUMMARY, TOP_TOWNS_PER_CLUSTER, KDE_HOTSPOT_CELLS, GI_STAR_HOTSPOTS, ONLINE_HOTSPOT_MODEL, VISUALS_DIR
+from storage import load_feature_matrix, read_artifact, write_artifact
+from feature_store import DERIVED_FEATURES, FeatureStore
+from kmeans_sweep import sweep_k
+from cluster_quality import cluster_quality
+from hotspot_surface import density_by_group, density_surface, rank_hotspot_cells
+from getis_ord import gi_star_by_area, gi_star_grid
+from online_hotspots import OnlineHotspotModel
+from chart_renderer import chart, render_charts
+from raster_map import raster_chart
+
+# Read only the columns this stage uses
+df = read_artifact(ONE_HOT, columns=['LATITUDE', 'LONGITUDE'])
+le_df = read_artifact(LABEL_ENCODED)
+raw_df = read_artifact(CLEANED, columns=['INCIDENT_ID', 'TOWN', 'SUBDIVISION', 'LATITUDE', 'LONGITUDE', 'CRIME_TYPE', 'DATE'])
 
 # -----------------------------
 # Feature selection for clustering
@@ -16,41 +30,32 @@ X = df[features] # new df with only selected features
 # -----------------------------
 # Choosing Optimal K
 # -----------------------------
-# - Elbow Method: Identify where adding more clusters stops giving meaningful improvement
-inertia = [] # how tightly grouped the data points are within each cluster
-K = range(1, 11)
-
-for k in K:
-    kmeans = KMeans(n_clusters=k, random_state=42)
-    kmeans.fit(X)
-    inertia.append(kmeans.inertia_) # Store the inertia value for this k
-
-plt.figure()
-plt.plot(K, inertia, marker='o')
-plt.xlabel('Number of clusters (k)')
-plt.ylabel('Inertia')
-plt.title('Elbow Method')
-plt.show()
-plt.savefig('/Users/shoaibhassan/Desktop/AI/PythonProjects/crime-data-analysis-&-hotspot-detection/visuals/03_01_elbow_method.png')
-
-# - Silhouette Analysis: Validate the quality and separation of clusters
-X_sample = X.sample(n=3000, random_state=42) # Sample data for efficiency
+# One sweep fits every k once (in parallel, warm-starting each k from k-1's centroids)
+# and scores both the Elbow Method and cluster quality on every incident from the same fits
+sweep = sweep_k(X, k_values=range(1, 11), random_state=42)
+print(sweep)
 
-silhouette_scores = []
-K_sil = range(2, 11) # silhouette score cannot be calculated for k=1, minimum clusters required is 2
+# - Elbow Method: Identify where adding more clusters stops giving meaningful improvement
+K = sweep['k']
+inertia = sweep['inertia'] # how tightly grouped the data points are within each cluster
 
-for k in K_sil:
-    kmeans = KMeans(n_clusters=k, random_state=42)
-    labels = kmeans.fit_predict(X_sample) # Fits the model and Returns cluster labels for each point
-    silhouette_scores.append(silhouette_score(X_sample, labels)) # recognise which points are same cluster and which are in different clusters and store the score
+# Chart specs are collected and rendered together (headless, in parallel) after the cluster map
+charts = [
+    chart('line', pd.DataFrame({'k': K, 'inertia': inertia}), '03_01_elbow_method.png', 'Elbow Method',
+          'Number of clusters (k)', 'Inertia', x='k', y='inertia', marker='o', figsize=(6.4, 4.8)),
+]
 
-plt.figure()
-plt.plot(K_sil, silhouette_scores, marker='o')
-plt.xlabel('Number of clusters (k)')
-plt.ylabel('Silhouette Score')
-plt.title('Silhouette Analysis')
-plt.show()
-plt.savefig('/Users/shoaibhassan/Desktop/AI/PythonProjects/crime-data-analysis-&-hotspot-detection/visuals/03_02_silhouette_analysis.png')
+# - Silhouette Analysis: Validate the quality and separation of clusters
+# Simplified (centroid-based) silhouette over all rows instead of the exact score on a 3000-row sample;
+# Davies-Bouldin (lower is better) and Calinski-Harabasz (higher is better) are in `sweep` as well
+# silhouette score cannot be calculated for k=1, minimum clusters required is 2
+K_sil = sweep.loc[sweep['k'] >= 2, 'k']
+silhouette_scores = sweep.loc[sweep['k'] >= 2, 'simplified_silhouette']
+
+charts.append(
+    chart('line', pd.DataFrame({'k': K_sil, 'silhouette': silhouette_scores}), '03_02_silhouette_analysis.png',
+          'Silhouette Analysis', 'Number of clusters (k)', 'Silhouette Score', x='k', y='silhouette', marker='o', figsize=(6.4, 4.8))
+)
 
 # -----------------------------
 # Clustering
@@ -59,6 +64,7 @@ optimal_k = 4  # determined from previous analysis
 kmeans_final = KMeans(n_clusters=optimal_k, random_state=42) # Fit K-Means with chosen k
 df['cluster'] = kmeans_final.fit_predict(X) # Assign cluster labels to each crime record
 df['cluster'] = df['cluster'].astype('category')
+print(cluster_quality(X, df['cluster'].cat.codes)) # quality of the chosen clustering, scored on every incident
 
 # -----------------------------
 # Cluster Analysis
@@ -89,39 +95,36 @@ cluster_analysis = cluster_analysis.reset_index(drop=True)
 # Display final cluster analysis
 print(cluster_analysis)
 
+# Profile of each cluster over every encoded feature: mean of the dense columns and share of incidents in
+# each town / subdivision / crime type category. The one-hot block stays sparse; a cluster-membership
+# matrix times the feature matrix gives per-cluster sums without densifying it.
+features_all, feature_names = load_feature_matrix(ONE_HOT, ONE_HOT_SPARSE)
+cluster_codes = df['cluster'].cat.codes.to_numpy()
+membership = sp.csr_matrix((np.ones(len(df)), (cluster_codes, np.arange(len(df)))))
+cluster_profile = pd.DataFrame(
+    (membership @ features_all).toarray() / np.bincount(cluster_codes)[:, None],
+    index=df['cluster'].cat.categories.rename('cluster'),
+    columns=feature_names
+)
+cluster_profile.filter(like='CRIME_TYPE_').T # crime type mix per cluster
+
 # -----------------------------
 # Visualization
 # -----------------------------
-plt.figure(figsize=(10, 8))
-
-# Plot all crimes colored by cluster
-scatter = plt.scatter(
-    df['LONGITUDE'], 
-    df['LATITUDE'], 
-    c=df['cluster'].cat.codes,  # numeric codes for clusters
-    cmap='viridis',             # colormap
-    alpha=0.5                   # transparency
+# Crimes binned onto a pixel grid, each pixel colored by its dominant cluster, with the cluster
+# centroids (hotspot centers) on top; one image instead of one marker per incident
+charts.append(
+    raster_chart(df['LONGITUDE'], df['LATITUDE'], '03_03_crime_clusters_hotspots.png', 'Crime Clusters and Hotspots in Karachi',
+                 labels=df['cluster'].cat.codes, overlay=cluster_analysis[['LONGITUDE', 'LATITUDE']], overlay_label='Hotspot Centroid')
 )
-plt.colorbar(scatter, label='Cluster')  # add color legend
-
-# Plot cluster centroids (hotspot centers)
-plt.scatter(
-    cluster_analysis['LONGITUDE'], 
-    cluster_analysis['LATITUDE'], 
-    s=200,
-    c='red',
-    marker='X',
-    label='Hotspot Centroid'
+# Same map colored by crime count per pixel
+charts.append(
+    raster_chart(df['LONGITUDE'], df['LATITUDE'], '03_04_crime_density_map.png', 'Crime Density in Karachi',
+                 overlay=cluster_analysis[['LONGITUDE', 'LATITUDE']], overlay_label='Hotspot Centroid')
 )
 
-plt.xlabel('Longitude')
-plt.ylabel('Latitude')
-plt.title('Crime Clusters and Hotspots in Karachi')
-plt.legend()
-plt.show()
-
-# Save figure
-plt.savefig('/Users/shoaibhassan/Desktop/AI/PythonProjects/crime-data-analysis-&-hotspot-detection/visuals/03_03_crime_clusters_hotspots.png')
+# Save figures
+print(render_charts(charts, VISUALS_DIR))
 
 # -----------------------------
 # Interpretation
@@ -152,6 +155,10 @@ le_df['SUBDIVISION_NAME'] = raw_df['SUBDIVISION'].values
 
 le_df[['TOWN_NAME', 'SUBDIVISION_NAME', 'cluster']].head()
 
+# Temporal features of each incident from the feature store built in 02 (rows are in the cleaned order)
+temporal = FeatureStore(FEATURE_STORE).attach(raw_df[['INCIDENT_ID']], DERIVED_FEATURES)
+le_df[DERIVED_FEATURES] = temporal[DERIVED_FEATURES].set_axis(le_df.index)
+
 # Link clusters back to towns / subdivisions
 town_cluster_summary = (
     le_df
@@ -193,22 +200,66 @@ top_high_risk_towns = (
 )
 top_high_risk_towns
 
+# -----------------------------
+# Kernel Density Hotspots
+# -----------------------------
+# Finer-grained complement to the K-Means centroids: density surface on a 250 m grid (raw, unscaled coordinates)
+surface = density_surface(raw_df['LATITUDE'], raw_df['LONGITUDE'])
+hotspot_cells = rank_hotspot_cells(surface, top_n=20) # densest cells, one per local peak
+hotspot_cells
+
+# Top hotspot cells per crime type (all surfaces share one grid)
+crime_type_surfaces = density_by_group(raw_df, 'CRIME_TYPE')
+crime_type_hotspots = pd.concat(
+    [rank_hotspot_cells(s, top_n=5).assign(CRIME_TYPE=crime_type) for crime_type, s in crime_type_surfaces.items()],
+    ignore_index=True
+)
+crime_type_hotspots
+
+# -----------------------------
+# Statistical Hotspots (Getis-Ord Gi*)
+# -----------------------------
+# Unlike the quantile-based risk_level above, Gi* z-scores test whether a unit's neighbourhood
+# has significantly more (hot) or fewer (cold) crimes than expected
+subdivision_hotspots = gi_star_by_area(raw_df, 'SUBDIVISION', distance_km=2.0)
+subdivision_hotspots.head(10)
+
+grid_hotspots = gi_star_grid(raw_df['LATITUDE'], raw_df['LONGITUDE'], cell_km=0.25, distance_km=1.0)
+grid_hotspots['hotspot_class'].value_counts()
+
 # -----------------------------
 # Save Outputs
 # -----------------------------
 # Save clustered dataset
-le_df.to_csv(
-    '/Users/shoaibhassan/Desktop/AI/PythonProjects/crime-data-analysis-&-hotspot-detection/data-processed/03_01_karachi_crime_2020_2025_with_clusters.csv',
-    index=False
+write_artifact(
+    le_df,
+    WITH_CLUSTERS
 )
 
 # Save hotspot summary
 cluster_analysis.to_csv(
-    '/Users/shoaibhassan/Desktop/AI/PythonProjects/crime-data-analysis-&-hotspot-detection/data-processed/03_02_karachi_crime_2020_2025_cluster_summary.csv',
+    CLUSTER_SUMMARY,
     index=False
 )
 
 top_towns_per_cluster.to_csv(
-    '/Users/shoaibhassan/Desktop/AI/PythonProjects/crime-data-analysis-&-hotspot-detection/data-processed/03_03_top_towns_per_cluster.csv',
+    TOP_TOWNS_PER_CLUSTER,
     index=False
-)
\ No newline at end of file
+)
+
+hotspot_cells.to_csv(
+    KDE_HOTSPOT_CELLS,
+    index=False
+)
+
+subdivision_hotspots.to_csv(
+    GI_STAR_HOTSPOTS,
+    index=False
+)
+
+# Persist an online hotspot model so daily incident batches update the hotspots without a full refit
+# (python src/online_hotspots.py <model> <batch>). It starts from kmeans_final's centroids and labels
+# (X is LATITUDE / LONGITUDE standardized over the same incidents), so its cluster ids match 'cluster'.
+online_model = OnlineHotspotModel.from_history(raw_df, half_life_days=365,
+                                               centroids=kmeans_final.cluster_centers_, labels=kmeans_final.labels_)
+online_model.save(ONLINE_HOTSPOT_MODEL)
\ No newline at end of file
@@ -1,25 +1,26 @@
-import pandas as pd
-import matplotlib.pyplot as plt
 from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import LabelEncoder
-from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import accuracy_score, confusion_matrix, classification_report
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))  # run directly or by src/pipeline.py
+from config import CLEANED, FEATURE_STORE, SEVERITY_MODEL, VISUALS_DIR
+from storage import read_artifact
+from feature_store import DERIVED_FEATURES, KEY, FeatureStore
+from severity_model import SeverityModel, FEATURES
+from chart_renderer import chart, render_charts
 
-raw_df = pd.read_csv('/Users/shoaibhassan/Desktop/AI/PythonProjects/crime-data-analysis-&-hotspot-detection/data-processed/02_01_karachi_crime_2020_2025_cleaned.csv')
+# Raw cleaned columns: the model package encodes TOWN / SUBDIVISION / CRIME_TYPE with its own frozen codes.
+# DAY_OF_WEEK, MONTH, IS_PEAK_HOUR and IS_WEEKEND come from the feature store built in 02.
+raw_df = read_artifact(CLEANED, columns=[KEY] + [col for col in FEATURES if col not in DERIVED_FEATURES] + ['SEVERITY'])
+raw_df = FeatureStore(FEATURE_STORE).attach(raw_df, DERIVED_FEATURES)
 raw_df.head().columns
 raw_df.head()
 
-le_df = pd.read_csv('/Users/shoaibhassan/Desktop/AI/PythonProjects/crime-data-analysis-&-hotspot-detection/data-processed/02_02_karachi_crime_2020_2025_label_encoded.csv')
-le_df.head().columns
-le_df.head()
-
 # -----------------------------
 # Define Target and Features
 # -----------------------------
-X = le_df[
-    ['LATITUDE', 'LONGITUDE', 'TOWN', 'SUBDIVISION', 'CRIME_TYPE', 'HOUR', 'DAY_OF_WEEK', 'MONTH', 'IS_PEAK_HOUR', 'IS_WEEKEND']
-]  # encoded categorical + numeric features
-y = raw_df['SEVERITY']  # categorical: High / Medium / Low
+X = raw_df[FEATURES]  # categorical + numeric features
+y = raw_df['SEVERITY'].astype(str)  # categorical: High / Medium / Low
 
 print("Features shape:", X.shape)
 print("Target shape:", y.shape)
@@ -28,47 +29,40 @@ print("Target shape:", y.shape)
 # Train / Test Split
 # -----------------------------
 X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-le = LabelEncoder()
-y_train_enc = le.fit_transform(y_train)
-y_test_enc = le.transform(y_test)
-
-print(le.classes_)
 
 # -----------------------------
 # Train Random Forest Classifier
 # -----------------------------
-rf_clf = RandomForestClassifier(
+severity_model = SeverityModel.train(
+    X_train,
+    y_train,
     n_estimators=100, # More trees → usually better performance, but slower training and more memory
-    random_state=42, 
-    class_weight='balanced' # automatically balances classes
+    n_jobs=-1, # build trees on all cores
+    random_state=42
 )
-rf_clf.fit(X_train, y_train_enc)
-y_pred = rf_clf.predict(X_test)
+print(severity_model.classes)
+y_pred = severity_model.predict(X_test) # batch scoring on all cores
+print("Scoring throughput:", severity_model.last_stats)
 
 # Evaluate Random Forest Classifier
-print("Accuracy:", accuracy_score(y_test_enc, y_pred)) # overall correctness
-print("Confusion Matrix:\n", confusion_matrix(y_test_enc, y_pred)) # see which classes are confused
-print("Classification Report:\n", classification_report(y_test_enc, y_pred, target_names=le.classes_)) # precision, recall, f1-score
+print("Accuracy:", accuracy_score(y_test, y_pred)) # overall correctness
+print("Confusion Matrix:\n", confusion_matrix(y_test, y_pred, labels=severity_model.classes)) # see which classes are confused
+print("Classification Report:\n", classification_report(y_test, y_pred)) # precision, recall, f1-score
+
+# Persist the forest with its encoders; SeverityModel.load() restores it for scoring
+severity_model.save(SEVERITY_MODEL)
 
 # -----------------------------
 # Feature Importance Visualization
 # -----------------------------
-importances = rf_clf.feature_importances_
-feature_names = X.columns
-feat_df = pd.DataFrame(
-    {'Feature': feature_names, 
-     'Importance': importances}
-)
-feat_df = feat_df.sort_values(by='Importance', ascending=False)
+feat_df = severity_model.feature_importances()
 print(feat_df)
 
 # -----------------------------
 # Visualize
 # -----------------------------
-plt.figure(figsize=(10,6))
-plt.barh(feat_df['Feature'], feat_df['Importance'])
-plt.xlabel('Importance')
-plt.title('Feature Importance for Crime Severity Classification')
-plt.gca().invert_yaxis()  # highest importance on top
-plt.show()
-plt.savefig('/Users/shoaibhassan/Desktop/AI/PythonProjects/crime-data-analysis-&-hotspot-detection/visuals/04_01_crime_severity_feature_importance.png')
\ No newline at end of file
+charts = [
+    chart('barh', feat_df, '04_01_crime_severity_feature_importance.png', 'Feature Importance for Crime Severity Classification',
+          'Importance', x='Feature', y='Importance', invert_yaxis=True),  # highest importance on top
+]
+print(render_charts(charts, VISUALS_DIR))
\ No newline at end of file
@@ -73,6 +73,7 @@ CREATE TABLE CrimeType_Dim (
 -- -----------------------------
 CREATE TABLE Crime_Fact (
     Crime_Fact_ID SERIAL PRIMARY KEY,
+    incident_id VARCHAR(100) UNIQUE,
     Time_ID INT REFERENCES Time_Dim(Time_ID),
     Location_ID INT REFERENCES Location_Dim(Location_ID),
     CrimeType_ID INT REFERENCES CrimeType_Dim(CrimeType_ID),
@@ -85,6 +86,7 @@ CREATE TABLE Crime_Fact (
 
 -- -----------------------------
 -- Populate Dimension Tables
+-- (one-off SQL load; src/warehouse_loader.py does the same incrementally from Python)
 -- -----------------------------
 INSERT INTO Time_Dim (date, hour, day_of_week, month, year, is_peak_hour, is_weekend)
 SELECT DISTINCT 
@@ -116,6 +118,7 @@ FROM temp_crime_data;
 -- Populate Fact Table
 -- -----------------------------
 INSERT INTO Crime_Fact (
+    incident_id,
     Time_ID,
     Location_ID,
     CrimeType_ID,
@@ -126,6 +129,7 @@ INSERT INTO Crime_Fact (
     cluster_label
 )
 SELECT
+    tc."INCIDENT_ID",
     t.Time_ID,
     l.Location_ID,
     c.CrimeType_ID,
@@ -137,45 +141,130 @@ SELECT
 FROM temp_crime_data tc
 JOIN Time_Dim t
     ON tc."DATE" = t.date AND tc."HOUR" = t.hour
+-- Join on the full Location_Dim row; joining on town/subdivision alone matches every
+-- location in the subdivision and multiplies the facts
 JOIN Location_Dim l
     ON tc."TOWN" = l.town AND tc."SUBDIVISION" = l.subdivision
+    AND tc."LATITUDE" = l.latitude AND tc."LONGITUDE" = l.longitude AND tc."RISK_ZONE" = l.risk_zone
 JOIN CrimeType_Dim c
     ON tc."CRIME_TYPE" = c.crime_type AND tc."SEVERITY" = c.severity;
 
 
 -- -----------------------------
--- Queries
+-- Indexes
 -- -----------------------------
--- Monthly crime trends by severity
-CREATE OR REPLACE VIEW vw_monthly_crime_trends AS
-SELECT 
-    t.year,
-    t.month,
-    c.severity,
-    COUNT(*) AS crime_count
+CREATE INDEX IF NOT EXISTS idx_crime_fact_time_id ON Crime_Fact (Time_ID);
+CREATE INDEX IF NOT EXISTS idx_crime_fact_location_id ON Crime_Fact (Location_ID);
+CREATE INDEX IF NOT EXISTS idx_crime_fact_crimetype_id ON Crime_Fact (CrimeType_ID);
+
+-- -----------------------------
+-- Rollup Tables
+-- (built here in full; src/warehouse_rollups.py refresh_rollups() adds the facts loaded since)
+-- -----------------------------
+CREATE TABLE rollup_state (
+    rollup VARCHAR(100) PRIMARY KEY,
+    last_fact_id INT NOT NULL
+);
+
+CREATE TABLE rollup_monthly_crime_trends (
+    year INT,
+    month INT,
+    severity VARCHAR(10),
+    crime_count BIGINT NOT NULL,
+    PRIMARY KEY (year, month, severity)
+);
+
+CREATE TABLE rollup_high_severity_towns (
+    town VARCHAR(100) PRIMARY KEY,
+    crime_count BIGINT NOT NULL
+);
+
+CREATE TABLE rollup_peak_hour_crimes (
+    is_peak_hour BOOLEAN PRIMARY KEY,
+    crime_count BIGINT NOT NULL
+);
+
+INSERT INTO rollup_monthly_crime_trends (year, month, severity, crime_count)
+SELECT t.year, t.month, c.severity, COUNT(*)
 FROM Crime_Fact f
 JOIN Time_Dim t ON f.Time_ID = t.Time_ID
 JOIN CrimeType_Dim c ON f.CrimeType_ID = c.CrimeType_ID
-GROUP BY t.year, t.month, c.severity
-ORDER BY t.year, t.month;
+GROUP BY t.year, t.month, c.severity;
 
--- Top towns by high-severity crimes
-CREATE OR REPLACE VIEW vw_top_high_severity_towns AS
-SELECT 
-    l.town,
-    COUNT(*) AS crime_count
+INSERT INTO rollup_high_severity_towns (town, crime_count)
+SELECT l.town, COUNT(*)
 FROM Crime_Fact f
 JOIN Location_Dim l ON f.Location_ID = l.Location_ID
 JOIN CrimeType_Dim c ON f.CrimeType_ID = c.CrimeType_ID
 WHERE c.severity = 'High'
-GROUP BY l.town
+GROUP BY l.town;
+
+INSERT INTO rollup_peak_hour_crimes (is_peak_hour, crime_count)
+SELECT is_peak_hour, COUNT(*)
+FROM Crime_Fact
+GROUP BY is_peak_hour;
+
+INSERT INTO rollup_state (rollup, last_fact_id)
+SELECT name, (SELECT COALESCE(MAX(Crime_Fact_ID), 0) FROM Crime_Fact)
+FROM (VALUES ('rollup_monthly_crime_trends'), ('rollup_high_severity_towns'), ('rollup_peak_hour_crimes')) AS r(name);
+
+
+-- -----------------------------
+-- Queries
+-- -----------------------------
+-- Monthly crime trends by severity
+CREATE OR REPLACE VIEW vw_monthly_crime_trends AS
+SELECT year, month, severity, crime_count
+FROM rollup_monthly_crime_trends
+ORDER BY year, month;
+
+-- Top towns by high-severity crimes
+CREATE OR REPLACE VIEW vw_top_high_severity_towns AS
+SELECT town, crime_count
+FROM rollup_high_severity_towns
 ORDER BY crime_count DESC
 LIMIT 10;
 
 -- Peak vs non-peak hour crimes (if needed)
 CREATE OR REPLACE VIEW vw_peak_hour_crimes AS
-SELECT 
-    is_peak_hour,
-    COUNT(*) AS crime_count
-FROM Crime_Fact
-GROUP BY is_peak_hour;
\ No newline at end of file
+SELECT is_peak_hour, crime_count
+FROM rollup_peak_hour_crimes;
+
+
+-- -----------------------------
+-- Server-side Aggregation
+-- -----------------------------
+-- Row counts per group for any table or view, called over RPC by supabase_connection.count_by().
+-- filters: [{"column": ..., "op": "eq|neq|gt|gte|lt|lte|in", "value": ...}]
+CREATE OR REPLACE FUNCTION group_counts(table_name TEXT, group_cols TEXT[], filters JSONB DEFAULT '[]')
+RETURNS SETOF JSONB
+LANGUAGE plpgsql STABLE AS $$
+DECLARE
+    cols TEXT := (SELECT string_agg(format('%I', c), ', ') FROM unnest(group_cols) AS c);
+    conds TEXT := 'TRUE';
+    f JSONB;
+    op TEXT;
+BEGIN
+    FOR f IN SELECT * FROM jsonb_array_elements(filters) LOOP
+        op := CASE f->>'op'
+            WHEN 'eq' THEN '=' WHEN 'neq' THEN '<>' WHEN 'gt' THEN '>'
+            WHEN 'gte' THEN '>=' WHEN 'lt' THEN '<' WHEN 'lte' THEN '<=' WHEN 'in' THEN 'in'
+        END;
+        IF op IS NULL THEN
+            RAISE EXCEPTION 'Unsupported filter op %', f->>'op';
+        END IF;
+        -- Values are untyped literals, so Postgres casts them to the column's type
+        IF op = 'in' THEN
+            conds := conds || format(' AND %I = ANY (%L)', f->>'column',
+                (SELECT array_agg(v) FROM jsonb_array_elements_text(f->'value') AS v)::TEXT);
+        ELSE
+            conds := conds || format(' AND %I %s %L', f->>'column', op, f->>'value');
+        END IF;
+    END LOOP;
+
+    RETURN QUERY EXECUTE format(
+        'SELECT to_jsonb(g) FROM (SELECT %s COUNT(*) AS crime_count FROM %I WHERE %s GROUP BY %s) g',
+        COALESCE(cols || ',', ''), table_name, conds, COALESCE(cols, '()')
+    );
+END;
+$$;
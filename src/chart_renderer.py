@@ -0,0 +1,141 @@
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+
+from instrumentation import instrumented
+
+RENDER_VERSION = 1  # bump when drawing code changes so every chart is redrawn
+MANIFEST_NAME = '.render_hashes.json'
+
+
+# Declarative chart spec: what to draw, not how. `data` is the aggregate behind the chart;
+# options: x, y, hue, marker, figsize, xticks, xtick_rotation, invert_yaxis, annot, fmt, cmap,
+# color, colorbar, alpha, overlay (second DataFrame drawn as labelled points), extent and log (raster).
+def chart(kind, data, filename, title, xlabel=None, ylabel=None, **options):
+    return {'kind': kind, 'data': data, 'filename': filename, 'title': title,
+            'xlabel': xlabel, 'ylabel': ylabel, 'options': options}
+
+
+def _frame_hash(df, h):
+    h.update(json.dumps([list(map(str, df.columns)), list(map(str, df.dtypes))]).encode())
+    h.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+
+
+# Hash of everything that affects the picture: the data, the spec and the drawing code version
+def spec_hash(spec):
+    h = hashlib.sha256()
+    options = {k: v for k, v in spec['options'].items() if k != 'overlay'}
+    meta = {k: v for k, v in spec.items() if k not in ('data', 'options')}
+    h.update(json.dumps([RENDER_VERSION, meta, options], sort_keys=True, default=str).encode())
+    _frame_hash(pd.DataFrame(spec['data']), h)
+    if 'overlay' in spec['options']:
+        _frame_hash(spec['options']['overlay'], h)
+    return h.hexdigest()
+
+
+# Draw on a bare Figure with the Agg canvas: no pyplot, no GUI, no global backend switch
+def _draw(spec, path):
+    from matplotlib.colors import LogNorm
+    from matplotlib.figure import Figure
+    import seaborn as sns
+
+    start = time.perf_counter()
+    kind, data, opt = spec['kind'], spec['data'], spec['options']
+    fig = Figure(figsize=opt.get('figsize', (10, 6)))
+    ax = fig.add_subplot()
+
+    if kind == 'heatmap':
+        sns.heatmap(data, annot=opt.get('annot', False), fmt=opt.get('fmt', '.2g'), cmap=opt.get('cmap'), ax=ax)
+    elif kind == 'scatter':
+        points = ax.scatter(data[opt['x']], data[opt['y']], c=data[opt['color']] if 'color' in opt else None,
+                            cmap=opt.get('cmap'), alpha=opt.get('alpha', 1.0), s=opt.get('s'))
+        if 'colorbar' in opt:
+            fig.colorbar(points, ax=ax, label=opt['colorbar'])
+    elif kind == 'raster':
+        # Pre-binned pixel grid (see raster_map.py); row 0 is the bottom of the map
+        image = ax.imshow(np.ma.masked_invalid(data.to_numpy(dtype=np.float64)), origin='lower', extent=opt['extent'],
+                          aspect='auto', interpolation='nearest', cmap=opt.get('cmap'),
+                          norm=LogNorm() if opt.get('log') else None)
+        if 'colorbar' in opt:
+            fig.colorbar(image, ax=ax, label=opt['colorbar'])
+    elif kind == 'barplot':
+        sns.barplot(data=data, x=opt['x'], y=opt['y'], ax=ax)
+    elif kind == 'line' and 'hue' in opt:
+        sns.lineplot(data=data, x=opt['x'], y=opt['y'], hue=opt['hue'], marker=opt.get('marker'), ax=ax)
+    elif kind in ('line', 'bar', 'barh'):
+        extra = {'marker': opt['marker']} if 'marker' in opt else {}
+        data.plot(x=opt['x'], y=opt['y'], kind=kind, legend=False, ax=ax, **extra)
+    else:
+        raise ValueError(f"Unknown chart kind: {kind}")
+
+    overlay = opt.get('overlay')
+    if overlay is not None:
+        ax.scatter(overlay[opt['x']], overlay[opt['y']], s=200, c='red', marker='X', label=opt.get('overlay_label'))
+        ax.legend()
+
+    ax.set_title(spec['title'])
+    if spec['xlabel'] is not None:
+        ax.set_xlabel(spec['xlabel'])
+    if spec['ylabel'] is not None:
+        ax.set_ylabel(spec['ylabel'])
+    if 'xticks' in opt:
+        ax.set_xticks(list(opt['xticks']))
+    if 'xtick_rotation' in opt:
+        ax.tick_params(axis='x', labelrotation=opt['xtick_rotation'])
+        if opt['xtick_rotation']:
+            for label in ax.get_xticklabels():
+                label.set_horizontalalignment('right')
+    if opt.get('invert_yaxis'):
+        ax.invert_yaxis()
+
+    fig.tight_layout()
+    fig.savefig(f'{path}.tmp.png', bbox_inches='tight')
+    os.replace(f'{path}.tmp.png', path)
+    return time.perf_counter() - start
+
+
+def _load_manifest(out_dir):
+    try:
+        with open(os.path.join(out_dir, MANIFEST_NAME)) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+# Render every chart whose hash changed (or whose file is missing) across worker processes;
+# returns one row per chart with its status and render time
+@instrumented('chart_renderer.render_charts', rows='specs')
+def render_charts(specs, out_dir, n_jobs=-1, force=False):
+    os.makedirs(out_dir, exist_ok=True)
+    manifest = _load_manifest(out_dir)
+    hashes = {spec['filename']: spec_hash(spec) for spec in specs}
+
+    todo = [
+        spec for spec in specs
+        if force or manifest.get(spec['filename']) != hashes[spec['filename']]
+        or not os.path.exists(os.path.join(out_dir, spec['filename']))
+    ]
+    seconds = []
+    if len(todo) == 1 or n_jobs == 1:
+        seconds = [_draw(spec, os.path.join(out_dir, spec['filename'])) for spec in todo]
+    elif todo:
+        seconds = Parallel(n_jobs=min(n_jobs if n_jobs > 0 else os.cpu_count(), len(todo)))(
+            delayed(_draw)(spec, os.path.join(out_dir, spec['filename'])) for spec in todo
+        )
+
+    rendered = {spec['filename']: s for spec, s in zip(todo, seconds)}
+    manifest.update({name: hashes[name] for name in rendered})
+    tmp_path = os.path.join(out_dir, f'{MANIFEST_NAME}.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, os.path.join(out_dir, MANIFEST_NAME))
+
+    return pd.DataFrame([
+        {'filename': name, 'status': 'rendered' if name in rendered else 'unchanged', 'seconds': rendered.get(name, 0.0)}
+        for name in hashes
+    ])
@@ -0,0 +1,86 @@
+import time
+
+import numpy as np
+from joblib import Parallel, delayed
+
+CHUNK_SIZE = 200_000
+
+
+def _chunks(n, chunk_size):
+    return [(start, min(start + chunk_size, n)) for start in range(0, n, chunk_size)]
+
+
+# Pass 1 over a chunk: per-cluster sums and counts (for the cluster means)
+def _sums(X, labels, k, start, end):
+    x, l = X[start:end], labels[start:end]
+    sums = np.zeros((k, X.shape[1]))
+    np.add.at(sums, l, x)
+    return sums, np.bincount(l, minlength=k)
+
+
+# Pass 2 over a chunk: distances to every centroid, O(chunk * k) memory
+def _distances(X, labels, centroids, start, end):
+    x, l = X[start:end], labels[start:end]
+    d2 = np.zeros((len(x), len(centroids)))
+    for j, centroid in enumerate(centroids):
+        d2[:, j] = ((x - centroid) ** 2).sum(axis=1)
+    d = np.sqrt(d2)
+    rows = np.arange(len(x))
+
+    a = d[rows, l]  # distance to own centroid
+    d[rows, l] = np.inf
+    b = d.min(axis=1)  # distance to nearest other centroid
+    with np.errstate(invalid='ignore', divide='ignore'):
+        s = np.where(np.maximum(a, b) > 0, (b - a) / np.maximum(a, b), 0.0)
+
+    return s.sum(), np.bincount(l, weights=a, minlength=len(centroids)), d2[rows, l].sum()
+
+
+# Centroid-based cluster quality over every row in bounded-memory chunks, O(n * k):
+# - simplified silhouette: a = distance to own centroid, b = distance to nearest other centroid
+# - Davies-Bouldin and Calinski-Harabasz (exact, they are centroid-based by definition)
+def cluster_quality(X, labels, chunk_size=CHUNK_SIZE, n_jobs=1):
+    start_time = time.perf_counter()
+    X = np.asarray(X, dtype=np.float64)
+    _, labels = np.unique(np.asarray(labels), return_inverse=True)
+    n, k = len(X), int(labels.max()) + 1 if len(labels) else 0
+    chunks = _chunks(n, chunk_size)
+    parallel = Parallel(n_jobs=n_jobs, prefer='threads')  # numpy releases the GIL in the heavy parts
+
+    sums, counts = np.zeros((k, X.shape[1])), np.zeros(k)
+    for chunk_sums, chunk_counts in parallel(delayed(_sums)(X, labels, k, s, e) for s, e in chunks):
+        sums += chunk_sums
+        counts += chunk_counts
+    centroids = sums / counts[:, None]
+
+    result = {'n_samples': n, 'n_clusters': k,
+              'simplified_silhouette': np.nan, 'davies_bouldin': np.nan, 'calinski_harabasz': np.nan}
+    if k < 2 or k >= n:
+        result['seconds'] = time.perf_counter() - start_time
+        return result
+
+    silhouette_sum, within_dist, within_ss = 0.0, np.zeros(k), 0.0
+    for chunk_s, chunk_dist, chunk_ss in parallel(delayed(_distances)(X, labels, centroids, s, e) for s, e in chunks):
+        silhouette_sum += chunk_s
+        within_dist += chunk_dist
+        within_ss += chunk_ss
+
+    # Davies-Bouldin: average over clusters of the worst (S_i + S_j) / d(c_i, c_j)
+    scatter = within_dist / counts
+    centroid_dist = np.sqrt(((centroids[:, None, :] - centroids[None, :, :]) ** 2).sum(axis=2))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = (scatter[:, None] + scatter[None, :]) / centroid_dist
+    ratio[~np.isfinite(ratio)] = 0.0
+    np.fill_diagonal(ratio, 0.0)
+
+    # Calinski-Harabasz: between-cluster over within-cluster dispersion (1.0 when every point sits on
+    # its centroid, as in sklearn's calinski_harabasz_score)
+    between_ss = (counts * ((centroids - sums.sum(axis=0) / n) ** 2).sum(axis=1)).sum()
+
+    result.update(
+        simplified_silhouette=silhouette_sum / n,
+        davies_bouldin=ratio.max(axis=1).mean(),
+        calinski_harabasz=(between_ss / (k - 1)) / (within_ss / (n - k)) if within_ss > 0 else 1.0,
+        seconds=time.perf_counter() - start_time,
+    )
+    return result
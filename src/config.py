@@ -0,0 +1,40 @@
+import os
+
+# Data locations; every directory can be moved with an environment variable (defaults: this repository)
+PROJECT_ROOT = os.getenv("CRIME_PROJECT_ROOT", os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")))
+RAW_DIR = os.getenv("CRIME_RAW_DIR", os.path.join(PROJECT_ROOT, "data-raw"))
+PROCESSED_DIR = os.getenv("CRIME_PROCESSED_DIR", os.path.join(PROJECT_ROOT, "data-processed"))
+MODELS_DIR = os.getenv("CRIME_MODELS_DIR", os.path.join(PROJECT_ROOT, "models"))
+VISUALS_DIR = os.getenv("CRIME_VISUALS_DIR", os.path.join(PROJECT_ROOT, "visuals"))
+BENCHMARK_DIR = os.getenv("CRIME_BENCHMARK_DIR", os.path.join(PROJECT_ROOT, "benchmarks"))
+NOTEBOOKS_DIR = os.path.join(PROJECT_ROOT, "notebooks")
+SRC_DIR = os.path.join(PROJECT_ROOT, "src")
+
+# Raw extract
+RAW_DATA = os.getenv("CRIME_RAW_DATA", os.path.join(RAW_DIR, "karachi_crime_2020_2025.csv"))
+
+# 02 - preprocessing & feature engineering
+CLEANED = os.path.join(PROCESSED_DIR, "02_01_karachi_crime_2020_2025_cleaned.parquet")
+LABEL_ENCODED = os.path.join(PROCESSED_DIR, "02_02_karachi_crime_2020_2025_label_encoded.parquet")
+ONE_HOT = os.path.join(PROCESSED_DIR, "02_03_karachi_crime_2020_2025_one_hot_encoded.parquet")
+ONE_HOT_SPARSE = os.path.join(PROCESSED_DIR, "02_03_karachi_crime_2020_2025_one_hot_encoded.npz")
+ROLLUP_CUBE = os.path.join(PROCESSED_DIR, "02_04_karachi_crime_2020_2025_rollup_cube.npz")
+FEATURE_STORE = os.path.join(PROCESSED_DIR, "feature_store")
+
+# 03 - clustering & hotspot detection
+WITH_CLUSTERS = os.path.join(PROCESSED_DIR, "03_01_karachi_crime_2020_2025_with_clusters.parquet")
+CLUSTER_SUMMARY = os.path.join(PROCESSED_DIR, "03_02_karachi_crime_2020_2025_cluster_summary.csv")
+TOP_TOWNS_PER_CLUSTER = os.path.join(PROCESSED_DIR, "03_03_top_towns_per_cluster.csv")
+KDE_HOTSPOT_CELLS = os.path.join(PROCESSED_DIR, "03_04_kde_hotspot_cells.csv")
+GI_STAR_HOTSPOTS = os.path.join(PROCESSED_DIR, "03_05_subdivision_gi_star_hotspots.csv")
+ONLINE_HOTSPOT_MODEL = os.path.join(PROCESSED_DIR, "03_06_online_hotspot_model.joblib")
+
+# 04 - severity classification
+SEVERITY_MODEL = os.path.join(MODELS_DIR, "severity_model.joblib")
+
+# Step metrics (src/instrumentation.py), one JSON line per step; "-" writes to stderr, "off" disables
+METRICS_LOG = os.getenv("CRIME_METRICS_LOG", os.path.join(PROCESSED_DIR, "metrics.jsonl"))
+
+# Scale benchmarks (src/scale_benchmark.py): one JSON record per stage run; synthetic inputs are regenerated on demand
+BENCHMARK_HISTORY = os.path.join(BENCHMARK_DIR, "scale_history.jsonl")
+BENCHMARK_DATA_DIR = os.path.join(BENCHMARK_DIR, "data")
@@ -1,55 +1,79 @@
-import matplotlib.pyplot as plt
-import seaborn as sns
-from supabase_connection import fetch_table
+import time
+from concurrent.futures import ThreadPoolExecutor
+from chart_renderer import chart, render_charts
+from config import VISUALS_DIR
+from supabase_connection import is_retryable
+from warehouse_backend import fetch_table
+
+VIEWS = ["vw_monthly_crime_trends", "vw_top_high_severity_towns", "vw_peak_hour_crimes"]
+
+
+# Fetch one view, retrying network / timeout / transient API errors with exponential backoff;
+# anything else (a bug, a bad query) fails on the first attempt
+def _fetch_with_retry(view_name, retries, backoff):
+    start = time.perf_counter()
+    for attempt in range(retries + 1):
+        try:
+            stats = {}
+            df = fetch_table(view_name, stats=stats)
+            timing = {
+                "seconds": time.perf_counter() - start,
+                "attempts": attempt + 1,
+                "rows": len(df),
+                "cached": stats.get("cached", False),
+            }
+            return df, timing
+        except Exception as error:
+            if attempt == retries or not is_retryable(error):
+                raise
+            time.sleep(backoff * 2 ** attempt)
+
+
+# Fetch any list of views at once; startup costs about as much as the slowest view.
+# All requests share one backend (set CRIME_WAREHOUSE_BACKEND=local to run offline).
+def fetch_views(view_names, timeout=60, retries=2, backoff=0.5, max_workers=None):
+    frames, timings = {}, {}
+    if not view_names:
+        return frames, timings
+    pool = ThreadPoolExecutor(max_workers=max_workers or len(view_names))
+    try:
+        futures = {name: pool.submit(_fetch_with_retry, name, retries, backoff) for name in view_names}
+        start = time.perf_counter()
+        for name, future in futures.items():
+            # timeout applies per view, measured from when the batch was submitted
+            remaining = max(timeout - (time.perf_counter() - start), 0)
+            try:
+                frames[name], timings[name] = future.result(timeout=remaining)
+            except TimeoutError:
+                raise TimeoutError(f"{name} did not load within {timeout}s") from None
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)  # don't block on a hung view
+    return frames, timings
 
 
 def load_views():
-    monthly_trends = fetch_table("vw_monthly_crime_trends")
-    top_towns = fetch_table("vw_top_high_severity_towns")
-    peak_hour = fetch_table("vw_peak_hour_crimes")
-    return monthly_trends, top_towns, peak_hour
-
-
-def plot_monthly_trends(df):
-    plt.figure(figsize=(10, 6))
-    sns.lineplot(
-        data=df,
-        x="month",
-        y="crime_count",
-        hue="severity",
-        marker="o"
-    )
-    plt.title("Monthly Crime Trends by Severity")
-    plt.tight_layout()
-    plt.show()
-
-
-def plot_top_towns(df):
-    plt.figure(figsize=(8, 5))
-    sns.barplot(
-        data=df,
-        x="crime_count",
-        y="town"
-    )
-    plt.title("Top Towns by High-Severity Crimes")
-    plt.tight_layout()
-    plt.show()
-
-
-def plot_peak_hour(df):
-    plt.figure(figsize=(5, 4))
-    sns.barplot(
-        data=df,
-        x="is_peak_hour",
-        y="crime_count"
-    )
-    plt.title("Peak vs Non-Peak Hour Crimes")
-    plt.tight_layout()
-    plt.show()
+    frames, timings = fetch_views(VIEWS)
+    for name, timing in timings.items():
+        print(f"{name}: {timing['rows']} rows in {timing['seconds']:.2f}s")
+    return tuple(frames[name] for name in VIEWS)
+
+
+# Chart specs for the three views; render_charts draws them headless and skips unchanged ones
+def monthly_trends_chart(df):
+    return chart("line", df, "monthly_crime_trends.png", "Monthly Crime Trends by Severity",
+                 x="month", y="crime_count", hue="severity", marker="o", figsize=(10, 6))
+
+
+def top_towns_chart(df):
+    return chart("barplot", df, "top_high_severity_towns.png", "Top Towns by High-Severity Crimes",
+                 x="crime_count", y="town", figsize=(8, 5))
+
+
+def peak_hour_chart(df):
+    return chart("barplot", df, "peak_hour_crimes.png", "Peak vs Non-Peak Hour Crimes",
+                 x="is_peak_hour", y="crime_count", figsize=(5, 4))
 
 
 if __name__ == "__main__":
     monthly, towns, peak = load_views()
-    plot_monthly_trends(monthly)
-    plot_top_towns(towns)
-    plot_peak_hour(peak)
+    print(render_charts([monthly_trends_chart(monthly), top_towns_chart(towns), peak_hour_chart(peak)], VISUALS_DIR))
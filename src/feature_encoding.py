@@ -0,0 +1,41 @@
+import pandas as pd
+from sklearn.preprocessing import LabelEncoder, OneHotEncoder, StandardScaler
+
+from instrumentation import step
+
+DROPPED_COLUMNS = ['INCIDENT_ID', 'SOURCE', 'SEVERITY', 'RISK_ZONE']  # not model inputs
+CATEGORICAL_COLUMNS = ['TOWN', 'TOWN_RISK_LEVEL', 'SUBDIVISION', 'SUBDIVISION_RISK_LEVEL', 'CRIME_TYPE']
+SCALED_COLUMNS = ['TOWN_PRIORITY_RANK', 'SUBDIVISION_PRIORITY_RANK', 'SEVERITY_SCORE', 'LATITUDE', 'LONGITUDE']
+
+
+# Encoding step of stage 02, shared with the scale benchmark. Returns
+# (label-encoded frame, one-hot frame, one-hot block, one-hot column names); both frames have the
+# numeric columns standardized. With sparse_one_hot the one-hot block stays a CSR matrix and the
+# one-hot frame holds only the dense columns; otherwise the block is also joined to the frame.
+def encode_features(df, sparse_one_hot=True):
+    df = df.drop(columns=DROPPED_COLUMNS, errors='ignore')
+
+    # Label encoding
+    le_df = df.copy()
+    le = LabelEncoder()
+    with step('encoding.label', rows=len(le_df)):
+        for col in CATEGORICAL_COLUMNS:
+            le_df[col] = le.fit_transform(le_df[col])
+
+    # One-hot encoding (for KMeans clustering)
+    ohe = OneHotEncoder(sparse_output=sparse_one_hot, handle_unknown='ignore', dtype='uint8')
+    with step('encoding.one_hot', rows=len(df)):
+        ohe_encoded = ohe.fit_transform(df[CATEGORICAL_COLUMNS])
+    ohe_columns = ohe.get_feature_names_out(CATEGORICAL_COLUMNS)
+
+    df = df.drop(columns=CATEGORICAL_COLUMNS)
+    if not sparse_one_hot:
+        df = pd.concat([df, pd.DataFrame(ohe_encoded, columns=ohe_columns, index=df.index)], axis=1)
+
+    # Scale numeric features
+    scaler = StandardScaler()
+    with step('encoding.scaling', rows=len(df)):
+        le_df[SCALED_COLUMNS] = scaler.fit_transform(le_df[SCALED_COLUMNS])
+        df[SCALED_COLUMNS] = scaler.fit_transform(df[SCALED_COLUMNS])
+
+    return le_df, df, ohe_encoded, ohe_columns
@@ -0,0 +1,97 @@
+import glob
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+KEY = 'INCIDENT_ID'
+TEMPORAL_FEATURES = ['HOUR', 'DAY_OF_WEEK', 'MONTH', 'YEAR', 'IS_PEAK_HOUR', 'IS_WEEKEND']
+DERIVED_FEATURES = TEMPORAL_FEATURES[1:]  # not in the raw extract (HOUR is recorded); read them with attach()
+RISK_FEATURES = ['TOWN_RISK_LEVEL', 'SUBDIVISION_RISK_LEVEL', 'RISK_ZONE',
+                 'IS_RED_ZONE', 'IS_ORANGE_ZONE', 'IS_YELLOW_ZONE', 'IS_GREEN_ZONE', 'IS_WHITE_ZONE']
+
+
+# Derive temporal features from DATE with column-wise operations (no row-wise apply)
+def add_temporal_features(df):
+    df['DATE'] = pd.to_datetime(df['DATE'], format='%Y-%m-%d', errors='coerce')
+    # Keep the recorded hour when the extract has one: DATE is a plain '%Y-%m-%d' date, so an hour
+    # derived from it is always 0
+    if 'HOUR' not in df:
+        df['HOUR'] = df['DATE'].dt.hour
+    df['DAY_OF_WEEK'] = df['DATE'].dt.dayofweek
+    df['MONTH'] = df['DATE'].dt.month
+    df['YEAR'] = df['DATE'].dt.year
+    df['IS_PEAK_HOUR'] = df['HOUR'].between(17, 20).astype('int64')  # Define peak hours as 5 PM to 8 PM
+    df['IS_WEEKEND'] = (df['DAY_OF_WEEK'] >= 5).astype('int64')  # Define weekend as Saturday (5) and Sunday (6)
+    return df
+
+
+# Append-only store of per-incident features, one Parquet part file per update.
+# Only incidents whose INCIDENT_ID is not in the store yet get their features computed.
+class FeatureStore:
+    def __init__(self, path):
+        self.path = path
+
+    def _parts(self):
+        return sorted(glob.glob(os.path.join(self.path, 'part-*.parquet')))
+
+    def known_ids(self):
+        parts = self._parts()
+        if not parts:
+            return pd.Index([])
+        return pd.Index(ds.dataset(parts, format='parquet').to_table(columns=[KEY]).column(KEY).to_pandas())
+
+    # Glob of the part files for SQL readers (e.g. DuckDB's read_parquet); None while the store is empty
+    def parts_glob(self):
+        return os.path.join(self.path, 'part-*.parquet') if self._parts() else None
+
+    # Compute and append features for new incidents; returns the number of rows added
+    def update(self, df):
+        new = df[~df[KEY].isin(self.known_ids())].drop_duplicates(subset=KEY)
+        if new.empty:
+            return 0
+
+        features = add_temporal_features(new[[KEY, 'DATE'] + [col for col in ['HOUR'] + RISK_FEATURES if col in new]].copy())
+        features = features[[KEY] + TEMPORAL_FEATURES + [col for col in RISK_FEATURES if col in features]]
+        features[TEMPORAL_FEATURES] = features[TEMPORAL_FEATURES].astype('Int64')  # same Arrow type in every part
+        for col in ['TOWN_RISK_LEVEL', 'SUBDIVISION_RISK_LEVEL', 'RISK_ZONE']:
+            if col in features:
+                features[col] = features[col].astype(str)  # plain strings so parts share one schema
+
+        os.makedirs(self.path, exist_ok=True)
+        part_path = os.path.join(self.path, f'part-{len(self._parts()):05d}.parquet')
+        pq.write_table(pa.Table.from_pandas(features, preserve_index=False), f'{part_path}.tmp', compression='zstd')
+        os.replace(f'{part_path}.tmp', part_path)
+        return len(features)
+
+    # Union of all stored features, optionally only some columns / incidents
+    def load(self, columns=None, incident_ids=None):
+        parts = self._parts()
+        if not parts:
+            return pd.DataFrame(columns=[KEY] + (columns or TEMPORAL_FEATURES))
+        dataset = ds.dataset(parts, format='parquet')
+        if columns is not None:
+            columns = [KEY] + [col for col in columns if col != KEY]
+        filter_ = ds.field(KEY).isin(list(incident_ids)) if incident_ids is not None else None
+        return dataset.to_table(columns=columns, filter=filter_).to_pandas()
+
+    # Join stored features onto incidents (existing columns of the same name are replaced); only the
+    # incidents' rows are read, the ID filter is applied while scanning the part files
+    def attach(self, df, columns=None):
+        features = self.load(columns, incident_ids=pd.unique(df[KEY].to_numpy()).tolist())
+        df = df.drop(columns=[col for col in features.columns if col != KEY and col in df])
+        return df.merge(features, on=KEY, how='left')
+
+    # Merge all part files into one (append-only history is kept logically, not physically)
+    def compact(self):
+        parts = self._parts()
+        if len(parts) <= 1:
+            return
+        table = ds.dataset(parts, format='parquet').to_table()
+        tmp_path = os.path.join(self.path, 'compacted.tmp')
+        pq.write_table(table, tmp_path, compression='zstd')
+        for part in parts:
+            os.remove(part)
+        os.replace(tmp_path, os.path.join(self.path, 'part-00000.parquet'))
@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from scipy.spatial import cKDTree
+from scipy.stats import norm
+
+from hotspot_surface import CELL_KM, KM_PER_DEG_LAT, KM_PER_DEG_LON_EQUATOR, bin_incidents, grid_bounds
+
+DISTANCE_KM = 1.0  # neighbourhood radius for the spatial weights
+
+
+def project_km(lat, lon):
+    lat, lon = np.asarray(lat, dtype=np.float64), np.asarray(lon, dtype=np.float64)
+    x = lon * KM_PER_DEG_LON_EQUATOR * np.cos(np.radians(lat.mean()))
+    return np.column_stack([x, lat * KM_PER_DEG_LAT])
+
+
+# Binary distance-band weights as a sparse CSR matrix built from a KD-tree; only neighbour pairs are
+# stored, so memory is O(n * neighbours) instead of O(n^2). Gi* includes each unit in its own neighbourhood.
+def distance_band_weights(coords_km, distance_km=DISTANCE_KM, include_self=True):
+    n = len(coords_km)
+    pairs = cKDTree(coords_km).query_pairs(distance_km, output_type='ndarray')
+    rows = np.concatenate([pairs[:, 0], pairs[:, 1]])
+    cols = np.concatenate([pairs[:, 1], pairs[:, 0]])
+    if include_self:
+        rows = np.concatenate([rows, np.arange(n)])
+        cols = np.concatenate([cols, np.arange(n)])
+    return sp.csr_matrix((np.ones(len(rows)), (rows, cols)), shape=(n, n))
+
+
+# Getis-Ord Gi* z-scores for every unit with sparse matrix-vector products:
+# Gi* = (sum_j w_ij x_j - mean * W_i) / (S * sqrt((n * sum_j w_ij^2 - W_i^2) / (n - 1)))
+def gi_star(values, weights):
+    x = np.asarray(values, dtype=np.float64)
+    n = len(x)
+    mean = x.mean()
+    s = np.sqrt((x ** 2).mean() - mean ** 2)
+
+    w_sum = np.asarray(weights.sum(axis=1)).ravel()
+    w_sq_sum = np.asarray(weights.multiply(weights).sum(axis=1)).ravel()
+    lag = weights @ x
+
+    denom = s * np.sqrt((n * w_sq_sum - w_sum ** 2) / (n - 1))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        z = np.where(denom > 0, (lag - mean * w_sum) / denom, 0.0)
+    p = 2 * norm.sf(np.abs(z))  # two-sided
+    return z, p
+
+
+def classify_hotspots(z, p):
+    labels = np.full(len(z), 'Not Significant', dtype=object)
+    for confidence, alpha in [(90, 0.10), (95, 0.05), (99, 0.01)]:
+        labels[(p <= alpha) & (z > 0)] = f'Hot Spot ({confidence}%)'
+        labels[(p <= alpha) & (z < 0)] = f'Cold Spot ({confidence}%)'
+    return labels
+
+
+# Gi* over a regular grid of incident counts (empty cells included, they are part of the statistic)
+def gi_star_grid(lat, lon, cell_km=CELL_KM, distance_km=DISTANCE_KM, bounds=None):
+    if bounds is None:
+        bounds = grid_bounds(lat, lon, 0)
+    counts, lat_edges, lon_edges = bin_incidents(lat, lon, bounds, cell_km)
+    n_rows, n_cols = counts.shape
+
+    # Cell centres on the grid are already evenly spaced in km
+    row, col = np.divmod(np.arange(n_rows * n_cols), n_cols)
+    coords_km = np.column_stack([col * cell_km, row * cell_km])
+    z, p = gi_star(counts.ravel(), distance_band_weights(coords_km, distance_km))
+
+    return pd.DataFrame({
+        'row': row,
+        'col': col,
+        'LATITUDE': ((lat_edges[:-1] + lat_edges[1:]) / 2)[row],
+        'LONGITUDE': ((lon_edges[:-1] + lon_edges[1:]) / 2)[col],
+        'crime_count': counts.ravel().astype(np.int64),
+        'gi_z': z,
+        'gi_p': p,
+        'hotspot_class': classify_hotspots(z, p),
+    })
+
+
+# Gi* over areal units (e.g. SUBDIVISION): units are placed at the mean coordinate of their incidents
+def gi_star_by_area(df, area_col='SUBDIVISION', distance_km=DISTANCE_KM):
+    areas = (
+        df.groupby(area_col, observed=True)
+        .agg(LATITUDE=('LATITUDE', 'mean'), LONGITUDE=('LONGITUDE', 'mean'), crime_count=('LATITUDE', 'size'))
+        .reset_index()
+    )
+    weights = distance_band_weights(project_km(areas['LATITUDE'], areas['LONGITUDE']), distance_km)
+    z, p = gi_star(areas['crime_count'], weights)
+    areas['gi_z'] = z
+    areas['gi_p'] = p
+    areas['hotspot_class'] = classify_hotspots(z, p)
+    return areas.sort_values('gi_z', ascending=False).reset_index(drop=True)
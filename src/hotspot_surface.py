@@ -0,0 +1,103 @@
+import numpy as np
+import pandas as pd
+from scipy.ndimage import maximum_filter
+from scipy.signal import fftconvolve
+
+KM_PER_DEG_LAT = 110.574
+KM_PER_DEG_LON_EQUATOR = 111.320
+CELL_KM = 0.25       # grid resolution
+BANDWIDTH_KM = 0.5   # Gaussian kernel sigma
+
+
+def grid_bounds(lat, lon, pad_km=2 * BANDWIDTH_KM):
+    lat, lon = np.asarray(lat), np.asarray(lon)
+    pad_lat = pad_km / KM_PER_DEG_LAT
+    pad_lon = pad_km / (KM_PER_DEG_LON_EQUATOR * np.cos(np.radians(lat.mean())))
+    return lat.min() - pad_lat, lon.min() - pad_lon, lat.max() + pad_lat, lon.max() + pad_lon
+
+
+def _gaussian_kernel(bandwidth_km, cell_km):
+    radius = max(int(np.ceil(4 * bandwidth_km / cell_km)), 1)  # truncate at 4 sigma
+    offsets = np.arange(-radius, radius + 1) * cell_km
+    kernel_1d = np.exp(-0.5 * (offsets / bandwidth_km) ** 2)
+    kernel = np.outer(kernel_1d, kernel_1d)
+    return kernel / kernel.sum()
+
+
+# Count incidents per grid cell with vectorized binning; incidents outside the bounds are dropped.
+# Returns (counts[n_rows, n_cols], lat_edges, lon_edges).
+def bin_incidents(lat, lon, bounds, cell_km=CELL_KM, weights=None):
+    lat, lon = np.asarray(lat, dtype=np.float64), np.asarray(lon, dtype=np.float64)
+    min_lat, min_lon, max_lat, max_lon = bounds
+
+    km_per_deg_lon = KM_PER_DEG_LON_EQUATOR * np.cos(np.radians((min_lat + max_lat) / 2))
+    n_rows = max(int(np.ceil((max_lat - min_lat) * KM_PER_DEG_LAT / cell_km)), 1)
+    n_cols = max(int(np.ceil((max_lon - min_lon) * km_per_deg_lon / cell_km)), 1)
+    lat_edges = min_lat + np.arange(n_rows + 1) * cell_km / KM_PER_DEG_LAT
+    lon_edges = min_lon + np.arange(n_cols + 1) * cell_km / km_per_deg_lon
+
+    row = np.floor((lat - min_lat) * KM_PER_DEG_LAT / cell_km).astype(np.int64)
+    col = np.floor((lon - min_lon) * km_per_deg_lon / cell_km).astype(np.int64)
+    inside = (row >= 0) & (row < n_rows) & (col >= 0) & (col < n_cols)
+    w = None if weights is None else np.asarray(weights, dtype=np.float64)[inside]
+    counts = np.bincount(row[inside] * n_cols + col[inside], weights=w, minlength=n_rows * n_cols)
+    return counts.reshape(n_rows, n_cols).astype(np.float64), lat_edges, lon_edges
+
+
+# Kernel density surface: bin incidents onto a lat/lon grid (O(n)), then convolve the grid with a
+# Gaussian kernel by FFT (O(cells log cells)), instead of evaluating a kernel per incident.
+# Density is in incidents per km^2. Pass the same bounds to compare surfaces (e.g. per crime type).
+def density_surface(lat, lon, bounds=None, cell_km=CELL_KM, bandwidth_km=BANDWIDTH_KM, weights=None):
+    if bounds is None:
+        bounds = grid_bounds(lat, lon, 2 * bandwidth_km)
+    counts, lat_edges, lon_edges = bin_incidents(lat, lon, bounds, cell_km, weights)
+
+    density = fftconvolve(counts, _gaussian_kernel(bandwidth_km, cell_km), mode='same')
+    density = np.clip(density, 0, None) / cell_km ** 2  # FFT round-off can give tiny negatives
+
+    return {
+        'density': density,
+        'counts': counts,
+        'lat_edges': lat_edges,
+        'lon_edges': lon_edges,
+        'cell_km': cell_km,
+        'bandwidth_km': bandwidth_km,
+    }
+
+
+# One surface per crime type / severity / ..., all on the same grid
+def density_by_group(df, by, cell_km=CELL_KM, bandwidth_km=BANDWIDTH_KM):
+    bounds = grid_bounds(df['LATITUDE'], df['LONGITUDE'], 2 * bandwidth_km)
+    return {
+        group: density_surface(part['LATITUDE'], part['LONGITUDE'], bounds, cell_km, bandwidth_km)
+        for group, part in df.groupby(by, observed=True)
+    }
+
+
+# Rank grid cells by density. With peaks_only, a cell must be the maximum of its
+# neighbourhood (one bandwidth around it), so one hotspot is not reported as many adjacent cells.
+def rank_hotspot_cells(surface, top_n=20, peaks_only=True):
+    density = surface['density']
+    candidates = density > 0
+    if peaks_only:
+        size = 2 * max(int(round(surface['bandwidth_km'] / surface['cell_km'])), 1) + 1
+        candidates &= density == maximum_filter(density, size=size, mode='constant')
+
+    rows, cols = np.nonzero(candidates)
+    order = np.argsort(density[rows, cols])[::-1][:top_n]
+    rows, cols = rows[order], cols[order]
+
+    lat_edges, lon_edges = surface['lat_edges'], surface['lon_edges']
+    cells = pd.DataFrame({
+        'rank': np.arange(1, len(rows) + 1),
+        'LATITUDE': (lat_edges[rows] + lat_edges[rows + 1]) / 2,
+        'LONGITUDE': (lon_edges[cols] + lon_edges[cols + 1]) / 2,
+        'density': density[rows, cols],
+        'crime_count': surface['counts'][rows, cols].astype(np.int64),
+        'row': rows,
+        'col': cols,
+    })
+    # Kernel-smoothed share of all incidents in the cell (percent, like cluster crime_percentage)
+    smoothed_share = density[rows, cols] * surface['cell_km'] ** 2 / max(surface['counts'].sum(), 1)
+    cells['crime_percentage'] = smoothed_share * 100
+    return cells
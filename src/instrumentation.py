@@ -0,0 +1,258 @@
+import contextlib
+import fnmatch
+import functools
+import inspect
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+import psutil
+
+from config import METRICS_LOG
+
+# Steps to run under the sampling profiler, as comma-separated name patterns (e.g. "fetch_table,*.fit")
+PROFILE_STEPS = [p for p in os.getenv("CRIME_PROFILE_STEPS", "").split(",") if p]
+PROFILE_DIR = os.getenv("CRIME_PROFILE_DIR")  # also write folded stacks (flame graph input) per profiled step
+PROFILE_INTERVAL = 0.005
+PROFILE_TOP = 15  # functions kept in the JSON record
+
+_write_lock = threading.Lock()
+_active = threading.local()  # stack of open steps per thread (parent field) and its pipeline stage
+_profiler_factory = None
+
+
+# Samples resident memory of this process and its worker processes in a background thread;
+# unlike tracemalloc this also sees memory allocated by compiled code (tree builders, OpenMP).
+# RSS is process-wide: it includes memory held by every other thread of the process.
+class PeakRSS:
+    def __init__(self, interval=0.01):
+        self.interval = interval
+        self.peak_bytes = 0
+        self._stop = threading.Event()
+
+    def _rss(self):
+        process = psutil.Process()
+        total = process.memory_info().rss
+        for child in process.children(recursive=True):
+            try:
+                total += child.memory_info().rss
+            except psutil.NoSuchProcess:
+                pass
+        return total
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak_bytes = max(self.peak_bytes, self._rss())
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self.start_bytes = self.peak_bytes = self._rss()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak_bytes = max(self.peak_bytes, self._rss())
+
+
+# Statistical profiler: a background thread samples the stack of the profiled thread every
+# `interval` seconds. Cheap enough for real workloads, and sees time spent inside C calls too.
+class SamplingProfiler:
+    def __init__(self, name, interval=PROFILE_INTERVAL):
+        self.name = name
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            if stack:
+                self.stacks[tuple(reversed(stack))] += 1
+
+    def __enter__(self):
+        self._thread_id = threading.get_ident()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+    # Hot functions below the frames every sample shares (the caller of the step): `top` by inclusive
+    # samples (time in the function or its callees), `self` by samples with the function on top of the stack
+    def summary(self, top=PROFILE_TOP):
+        total = sum(self.stacks.values())
+        names = [[frame.rsplit(':', 1)[0] for frame in stack] for stack in self.stacks]
+        shared = 0
+        while names and all(len(n) > shared + 1 for n in names) and len({n[shared] for n in names}) == 1:
+            shared += 1
+        inclusive, own = Counter(), Counter()
+        for stack_names, count in zip(names, self.stacks.values()):
+            for name in set(stack_names[shared:]):
+                inclusive[name] += count
+            own[stack_names[-1]] += count
+        result = {
+            'samples': total,
+            'top': [{'function': name, 'share': count / total} for name, count in inclusive.most_common(top)],
+            'self': [{'function': name, 'share': count / total} for name, count in own.most_common(top)],
+        }
+        if PROFILE_DIR:
+            os.makedirs(PROFILE_DIR, exist_ok=True)
+            path = os.path.join(PROFILE_DIR, f"{self.name}-{datetime.now(timezone.utc):%Y%m%dT%H%M%S%f}.folded")
+            with open(path, 'w') as f:
+                f.writelines(f"{';'.join(stack)} {count}\n" for stack, count in self.stacks.items())
+            result['folded_path'] = path
+        return result
+
+
+# Replace the profiler used for profiled steps: factory(step_name) returns a context manager with
+# a summary() method whose JSON-serializable result goes into the step record (None: built-in sampler)
+def set_profiler(factory):
+    global _profiler_factory
+    _profiler_factory = factory
+
+
+# Tag the steps run by this thread with a pipeline stage (run_pipeline does this per stage; a stage
+# run in its own process gets the name from CRIME_PIPELINE_STAGE instead)
+@contextlib.contextmanager
+def stage_context(name):
+    previous = getattr(_active, 'stage', None)
+    _active.stage = name
+    try:
+        yield
+    finally:
+        _active.stage = previous
+
+
+def current_stage():
+    return getattr(_active, 'stage', None) or os.getenv("CRIME_PIPELINE_STAGE")
+
+
+def _emit(record, sink=None):
+    sink = METRICS_LOG if sink is None else sink
+    if not sink or sink == "off":
+        return
+    line = json.dumps(record, default=str) + "\n"
+    with _write_lock:
+        if sink == "-":
+            sys.stderr.write(line)
+        else:
+            os.makedirs(os.path.dirname(os.path.abspath(sink)), exist_ok=True)
+            with open(sink, "a") as f:
+                f.write(line)
+
+
+# Measures one step and emits it as a JSON line: wall time, CPU time (all threads of this process),
+# peak RSS (this process and its workers), rows and rows/sec. Use as a context manager and set
+# `.rows` once known, or as a decorator (see `instrumented`). Extra keyword fields go into the record.
+# CPU time and RSS are process-wide, so when pipeline stages run as threads (run_pipeline's default)
+# they include whatever the other running stage did; the thread and stage fields tell records apart.
+# For per-stage memory figures run the pipeline with --processes (or --jobs 1).
+class step:
+    def __init__(self, name, rows=None, profile=None, log=True, **fields):
+        self.name = name
+        self.rows = rows
+        self.profile = profile if profile is not None else any(fnmatch.fnmatch(name, p) for p in PROFILE_STEPS)
+        self.log = log
+        self.fields = fields
+        self.record = None
+
+    def __enter__(self):
+        stack = _active.__dict__.setdefault('stack', [])
+        self._parent = stack[-1].name if stack else None
+        stack.append(self)
+        self._memory = PeakRSS().__enter__()
+        self._profiler = None
+        if self.profile:
+            self._profiler = (_profiler_factory or SamplingProfiler)(self.name)
+            self._profiler.__enter__()
+        self._cpu = time.process_time()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        wall = time.perf_counter() - self._start
+        cpu = time.process_time() - self._cpu
+        if self._profiler is not None:
+            self._profiler.__exit__(exc_type, exc, tb)
+        self._memory.__exit__(exc_type, exc, tb)
+        _active.stack.pop()
+
+        self.record = {
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'step': self.name,
+            'parent': self._parent,
+            'status': 'ok' if exc_type is None else 'error',
+            'wall_seconds': wall,
+            'cpu_seconds': cpu,
+            'peak_rss_mb': self._memory.peak_bytes / 1e6,
+            'rss_growth_mb': (self._memory.peak_bytes - self._memory.start_bytes) / 1e6,
+            'rows': self.rows,
+            'rows_per_second': self.rows / wall if self.rows is not None and wall > 0 else None,
+            'pid': os.getpid(),
+            'thread': threading.current_thread().name,
+            'stage': current_stage(),
+            **self.fields,
+        }
+        if exc_type is not None:
+            self.record['error'] = f"{exc_type.__name__}: {exc}"
+        if self._profiler is not None:
+            self.record['profile'] = self._profiler.summary()
+        if self.log:
+            _emit(self.record)
+        return False
+
+
+# Row count of a step's result: DataFrames, arrays and sparse matrices by their first dimension,
+# (matrix, columns) tuples by the matrix
+def result_rows(result):
+    if isinstance(result, tuple) and result:
+        result = result[0]
+    shape = getattr(result, 'shape', None)
+    if shape:
+        return int(shape[0])
+    return None
+
+
+# Decorator form of `step`. rows: a function of the result (default: size of the result) or the
+# name of an argument whose size is the rows processed, e.g. @instrumented('model.fit', rows='df')
+def instrumented(name=None, rows=result_rows, profile=None):
+    def decorate(fn):
+        step_name = name or f"{fn.__module__}.{fn.__qualname__}"
+        signature = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with step(step_name, profile=profile) as s:
+                if isinstance(rows, str):
+                    arg = signature.bind_partial(*args, **kwargs).arguments.get(rows)
+                    s.rows = result_rows(arg) if hasattr(arg, 'shape') else (len(arg) if arg is not None else None)
+                result = fn(*args, **kwargs)
+                if callable(rows):
+                    s.rows = rows(result)
+            return result
+        return wrapper
+    return decorate
+
+
+# Records of a JSON-lines metrics log as a DataFrame, e.g. to find the slowest or largest steps
+def load_metrics(path=METRICS_LOG):
+    import pandas as pd
+
+    if not os.path.exists(path):
+        return pd.DataFrame()
+    with open(path) as f:
+        return pd.DataFrame([json.loads(line) for line in f if line.strip()])
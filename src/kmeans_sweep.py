@@ -0,0 +1,114 @@
+import os
+import time
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.cluster import KMeans, MiniBatchKMeans
+from sklearn.metrics import silhouette_score
+from cluster_quality import cluster_quality
+from instrumentation import instrumented
+
+# Fewest k values per block when warm starting. Smaller blocks spread the sweep over more workers,
+# but every block starts cold, so one-k blocks lose the warm starts entirely; with the default
+# range(1, 11) this caps the sweep at 3 workers however many cores the machine has.
+MIN_BLOCK = 3
+
+
+# Centroids for k clusters built from the k-1 solution: keep the old centroids and add
+# one new centroid picked k-means++ style (probability proportional to squared distance)
+def _grow_centroids(X, centroids, rng):
+    d2 = np.full(len(X), np.inf)
+    for centroid in centroids:  # one centroid at a time keeps memory at O(n)
+        np.minimum(d2, ((X - centroid) ** 2).sum(axis=1), out=d2)
+    if d2.sum() == 0:
+        new = X[rng.integers(len(X))]
+    else:
+        new = X[rng.choice(len(X), p=d2 / d2.sum())]
+    return np.vstack([centroids, new])
+
+
+def _fit(X, k, init, mini_batch, random_state):
+    params = {'n_clusters': k, 'random_state': random_state}
+    if init is not None:
+        params.update(init=init, n_init=1)
+    if mini_batch:
+        return MiniBatchKMeans(batch_size=4096, **params).fit(X)
+    return KMeans(**params).fit(X)
+
+
+# Fit a contiguous run of k values; with warm_start each k starts from the previous k's centroids
+def _sweep_block(X, k_values, warm_start, mini_batch, silhouette_sample, random_state):
+    rng = np.random.default_rng(random_state)
+    sample_idx = None
+    if silhouette_sample and len(X) > silhouette_sample:
+        sample_idx = np.random.default_rng(random_state).choice(len(X), silhouette_sample, replace=False)
+
+    results = []
+    centroids = None
+    for k in k_values:
+        init = None
+        if warm_start and centroids is not None and len(centroids) == k - 1:
+            init = _grow_centroids(X, centroids, rng)
+
+        start = time.perf_counter()
+        model = _fit(X, k, init, mini_batch, random_state)
+        fit_seconds = time.perf_counter() - start
+        centroids = model.cluster_centers_
+
+        # Centroid-based quality metrics over every row, O(n * k)
+        quality = cluster_quality(X, model.labels_)
+
+        # Exact silhouette is O(n^2), so it is only scored on request, on a sample (no refit)
+        silhouette, silhouette_seconds = np.nan, 0.0
+        if k >= 2 and silhouette_sample:
+            start = time.perf_counter()
+            labels = model.labels_ if sample_idx is None else model.labels_[sample_idx]
+            X_eval = X if sample_idx is None else X[sample_idx]
+            if len(np.unique(labels)) >= 2:
+                silhouette = silhouette_score(X_eval, labels)
+            silhouette_seconds = time.perf_counter() - start
+
+        results.append({
+            'k': k,
+            'inertia': model.inertia_,
+            'simplified_silhouette': quality['simplified_silhouette'],
+            'davies_bouldin': quality['davies_bouldin'],
+            'calinski_harabasz': quality['calinski_harabasz'],
+            'silhouette': silhouette,
+            'n_iter': model.n_iter_,
+            'warm_started': init is not None,
+            'fit_seconds': fit_seconds,
+            'quality_seconds': quality['seconds'],
+            'silhouette_seconds': silhouette_seconds,
+        })
+    return results
+
+
+# Elbow + silhouette sweep over k in one pass, spread across worker processes.
+# k values are split into contiguous blocks (one per worker) so warm starts still chain within a block;
+# blocks hold at least min_block neighbouring k values, which trades parallelism for warm starts.
+@instrumented('kmeans_sweep.sweep_k', rows='X')
+def sweep_k(X, k_values=range(1, 11), warm_start=True, mini_batch=False, n_jobs=None,
+            silhouette_sample=None, random_state=42, min_block=MIN_BLOCK):
+    X = np.ascontiguousarray(np.asarray(X, dtype=np.float64))
+    k_values = list(k_values)
+
+    if warm_start:
+        n_blocks = max(1, min(n_jobs or os.cpu_count() or 1, len(k_values) // max(min_block, 1)))
+        blocks = [list(block) for block in np.array_split(k_values, n_blocks) if len(block)]
+    else:
+        blocks = [[k] for k in k_values]
+    n_jobs = min(n_jobs or os.cpu_count() or 1, len(blocks))
+
+    start = time.perf_counter()
+    # joblib's process backend memory-maps X for the workers and, unlike a bare process pool,
+    # does not re-run the calling script when it is used at the top level of a notebook/script
+    block_results = Parallel(n_jobs=n_jobs)(
+        delayed(_sweep_block)(X, block, warm_start, mini_batch, silhouette_sample, random_state)
+        for block in blocks
+    )
+
+    result = pd.DataFrame([row for block in block_results for row in block]).sort_values('k').reset_index(drop=True)
+    result.attrs['total_seconds'] = time.perf_counter() - start
+    return result
@@ -0,0 +1,165 @@
+import sys
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.cluster import KMeans
+from storage import read_artifact
+
+FEATURES = ['LATITUDE', 'LONGITUDE']
+
+
+# Same quantile rule as assign_risk_quantile in 03_clustering_and_hotspot_detection.py
+def assign_risk_levels(crime_percentage):
+    q1, q2, q3 = crime_percentage.quantile([0.25, 0.5, 0.75])
+    return pd.Series(
+        np.select(
+            [crime_percentage >= q3, crime_percentage >= q2, crime_percentage >= q1],
+            ['High', 'Medium', 'Low'],
+            default='Very Low'
+        ),
+        index=crime_percentage.index
+    )
+
+
+# K-Means hotspot model that is updated from daily incident batches instead of being refit.
+# Each cluster keeps a (decayed) weight; a batch moves a centroid to the weighted mean of its old
+# position and the new incidents assigned to it. With half_life_days, old incidents fade out
+# exponentially. Per-cluster and per-town counts are running (decayed) totals.
+class OnlineHotspotModel:
+    def __init__(self, centroids, mean, scale, half_life_days=None):
+        self.centroids = np.asarray(centroids, dtype=np.float64)  # in standardized coordinates
+        self.mean = np.asarray(mean, dtype=np.float64)  # frozen standardization, so batches stay comparable
+        self.scale = np.asarray(scale, dtype=np.float64)
+        self.half_life_days = half_life_days
+        self.weights = np.zeros(len(self.centroids))
+        self.town_counts = {}  # town -> per-cluster counts
+        self.last_date = None
+        self.n_batches = 0
+
+    # Initial fit on the incident history (the only full K-Means fit); history counts start undecayed.
+    # centroids / labels of an existing fit on the standardized history (e.g. the clustering stage's
+    # KMeans) are reused instead, so the model's cluster ids match that fit's.
+    @classmethod
+    def from_history(cls, df, n_clusters=4, half_life_days=None, random_state=42, centroids=None, labels=None):
+        X = df[FEATURES].to_numpy(dtype=np.float64)
+        mean, scale = X.mean(axis=0), X.std(axis=0)
+        if centroids is None:
+            kmeans = KMeans(n_clusters=n_clusters, random_state=random_state).fit((X - mean) / scale)
+            centroids, labels = kmeans.cluster_centers_, kmeans.labels_
+        model = cls(centroids, mean, scale, half_life_days)
+        model.partial_fit(df, labels=labels, move_centroids=False)
+        return model
+
+    def _standardize(self, df):
+        return (df[FEATURES].to_numpy(dtype=np.float64) - self.mean) / self.scale
+
+    def predict(self, df):
+        X = self._standardize(df)
+        d2 = ((X[:, None, :] - self.centroids[None, :, :]) ** 2).sum(axis=2)
+        return d2.argmin(axis=1)
+
+    def _decay(self, batch_date):
+        if self.half_life_days is None or batch_date is None or self.last_date is None:
+            return 1.0
+        elapsed_days = max((batch_date - self.last_date) / np.timedelta64(1, 'D'), 0.0)
+        return 0.5 ** (elapsed_days / self.half_life_days)
+
+    # Fold a batch of new incidents into the model; returns the batch's cluster labels
+    def partial_fit(self, df, labels=None, move_centroids=True):
+        if df.empty:
+            return np.array([], dtype=np.int64)
+        X = self._standardize(df)
+        if labels is None:
+            labels = self.predict(df)
+        labels = np.asarray(labels)
+        k = len(self.centroids)
+
+        batch_date = pd.to_datetime(df['DATE']).max().to_datetime64() if 'DATE' in df else None
+        factor = self._decay(batch_date)
+        if batch_date is not None:
+            self.last_date = batch_date if self.last_date is None else max(self.last_date, batch_date)
+
+        # Decay everything seen so far, then add the batch
+        old_weights = self.weights * factor
+        batch_counts = np.bincount(labels, minlength=k).astype(np.float64)
+        self.weights = old_weights + batch_counts
+
+        if move_centroids:
+            batch_sums = np.zeros_like(self.centroids)
+            np.add.at(batch_sums, labels, X)
+            has_weight = self.weights > 0
+            self.centroids[has_weight] = (
+                old_weights[has_weight, None] * self.centroids[has_weight] + batch_sums[has_weight]
+            ) / self.weights[has_weight, None]
+
+        for town in self.town_counts:
+            self.town_counts[town] *= factor
+        if 'TOWN' in df:
+            per_town = pd.crosstab(df['TOWN'].to_numpy(), labels)
+            for town, row in per_town.iterrows():
+                counts = self.town_counts.setdefault(town, np.zeros(k))
+                counts[row.index.to_numpy()] += row.to_numpy()
+
+        self.n_batches += 1
+        return labels
+
+    # -----------------------------
+    # Outputs (same shape as 03_clustering_and_hotspot_detection.py, from running counts)
+    # -----------------------------
+    def cluster_analysis(self):
+        centroids = self.centroids * self.scale + self.mean  # back to lat/lon
+        analysis = pd.DataFrame({
+            'cluster': np.arange(len(self.centroids)),
+            'LATITUDE': centroids[:, 0],
+            'LONGITUDE': centroids[:, 1],
+            'crime_count': self.weights,
+        })
+        analysis = analysis.sort_values(by='crime_count', ascending=False)
+        analysis['crime_percentage'] = analysis['crime_count'] / max(self.weights.sum(), 1e-12) * 100
+        analysis['risk_level'] = assign_risk_levels(analysis['crime_percentage'])
+        return analysis.reset_index(drop=True)
+
+    def town_cluster_summary(self):
+        if not self.town_counts:
+            return pd.DataFrame(columns=['cluster', 'TOWN_NAME', 'crime_count', 'risk_level'])
+        counts = pd.DataFrame(self.town_counts).T  # towns x clusters
+        summary = (
+            counts.stack()
+            .rename_axis(['TOWN_NAME', 'cluster'])
+            .reset_index(name='crime_count')
+        )
+        summary = summary[summary['crime_count'] > 0]
+        summary = summary[['cluster', 'TOWN_NAME', 'crime_count']].sort_values(['cluster', 'crime_count'], ascending=[True, False])
+        summary = summary.merge(self.cluster_analysis()[['cluster', 'risk_level']], on='cluster', how='left')
+        return summary.reset_index(drop=True)
+
+    def top_towns_per_cluster(self, n=3):
+        summary = self.town_cluster_summary()
+        return summary.groupby('cluster').head(n)[['cluster', 'TOWN_NAME', 'crime_count']].reset_index(drop=True)
+
+    # -----------------------------
+    # Persistence
+    # -----------------------------
+    def save(self, path):
+        joblib.dump(dict(self.__dict__), path)
+
+    @classmethod
+    def load(cls, path):
+        model = cls.__new__(cls)
+        model.__dict__.update(joblib.load(path))
+        return model
+
+
+# Daily job: fold a batch of new incidents into the persisted model and return the refreshed tables
+def update_from_batch(model_path, batch_path):
+    model = OnlineHotspotModel.load(model_path)
+    model.partial_fit(read_artifact(batch_path, columns=FEATURES + ['TOWN', 'DATE']))
+    model.save(model_path)
+    return model.cluster_analysis(), model.town_cluster_summary(), model.top_towns_per_cluster()
+
+
+if __name__ == "__main__":
+    cluster_analysis, town_cluster_summary, top_towns_per_cluster = update_from_batch(sys.argv[1], sys.argv[2])
+    print(cluster_analysis)
+    print(top_towns_per_cluster)
@@ -0,0 +1,225 @@
+import argparse
+import hashlib
+import json
+import os
+import re
+import runpy
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import pandas as pd
+
+import storage
+from config import (CLEANED, CLUSTER_SUMMARY, FEATURE_STORE, GI_STAR_HOTSPOTS, KDE_HOTSPOT_CELLS, LABEL_ENCODED,
+                    NOTEBOOKS_DIR, ONE_HOT, ONE_HOT_SPARSE, ONLINE_HOTSPOT_MODEL, PROCESSED_DIR, RAW_DATA, ROLLUP_CUBE,
+                    SEVERITY_MODEL, SRC_DIR, TOP_TOWNS_PER_CLUSTER, VISUALS_DIR, WITH_CLUSTERS)
+from instrumentation import stage_context
+
+STATE_PATH = os.path.join(PROCESSED_DIR, ".pipeline_state.json")
+
+
+def _visuals(*names):
+    return [os.path.join(VISUALS_DIR, name) for name in names]
+
+
+# Each stage declares the files it reads and writes; the DAG follows from matching paths
+STAGES = {
+    "01_data_overview": {
+        "script": "01_data_overview.py",
+        "inputs": [RAW_DATA],
+        "outputs": _visuals("01_01_severity_distribution.png", "01_02_crime_type_distribution.png",
+                            "01_03_crime_by_town.png", "01_04_crime_by_subdivision.png"),
+    },
+    # 02 streams the raw CSV through streaming_preprocessing (bounded memory) and reads back the cleaned Parquet
+    "02_preprocessing_feature_engineering": {
+        "script": "02_preprocessing_feature_engineering.py",
+        "inputs": [RAW_DATA],
+        "outputs": [CLEANED, LABEL_ENCODED, ONE_HOT, ONE_HOT_SPARSE, ROLLUP_CUBE, FEATURE_STORE],
+    },
+    "03_clustering_and_hotspot_detection": {
+        "script": "03_clustering_and_hotspot_detection.py",
+        "inputs": [ONE_HOT, ONE_HOT_SPARSE, LABEL_ENCODED, CLEANED, FEATURE_STORE],
+        "outputs": [WITH_CLUSTERS, CLUSTER_SUMMARY, TOP_TOWNS_PER_CLUSTER, KDE_HOTSPOT_CELLS, GI_STAR_HOTSPOTS,
+                    ONLINE_HOTSPOT_MODEL] + _visuals("03_01_elbow_method.png", "03_02_silhouette_analysis.png",
+                                                     "03_03_crime_clusters_hotspots.png", "03_04_crime_density_map.png"),
+    },
+    "04_crime_severity_classification": {
+        "script": "04_crime_severity_classification.py",
+        "inputs": [CLEANED, FEATURE_STORE],
+        "outputs": [SEVERITY_MODEL] + _visuals("04_01_crime_severity_feature_importance.png"),
+    },
+    "05_crime_type_trends_analysis": {
+        "script": "05_crime_type_trends_analysis.py",
+        "inputs": [ROLLUP_CUBE],
+        "outputs": _visuals("05_01_crime_by_day_of_the_week.png", "05_02_crime_by_month.png", "05_03_crime_by_year.png",
+                            "05_04_crime_by_month_year.png", "05_05_top_crime_types.png"),
+    },
+}
+
+
+def dependencies(stages=STAGES):
+    producers = {os.path.abspath(path): name for name, stage in stages.items() for path in stage["outputs"]}
+    return {
+        name: sorted({producers[os.path.abspath(path)] for path in stage["inputs"] if os.path.abspath(path) in producers} - {name})
+        for name, stage in stages.items()
+    }
+
+
+# -----------------------------
+# Content hashes
+# -----------------------------
+_IMPORT = re.compile(r"^\s*(?:from|import)\s+([A-Za-z_]\w*)", re.MULTILINE)
+
+
+# The script plus every src module it imports (transitively), so library changes re-run the stage
+def code_files(script_path):
+    files, pending = [script_path], [script_path]
+    while pending:
+        with open(pending.pop()) as f:
+            for module in _IMPORT.findall(f.read()):
+                path = os.path.join(SRC_DIR, f"{module}.py")
+                if os.path.exists(path) and path not in files:
+                    files.append(path)
+                    pending.append(path)
+    return sorted(files)
+
+
+class _FileHashes:
+    # File content hashes, reused while size and mtime are unchanged (big inputs are hashed once)
+    def __init__(self, known, lock):
+        self.known = known
+        self._lock = lock  # shared with state saving, which serializes `known`
+
+    def file(self, path):
+        stat = os.stat(path)
+        with self._lock:
+            cached = self.known.get(path)
+        if cached and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+            return cached[2]
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+        with self._lock:
+            self.known[path] = [stat.st_size, stat.st_mtime_ns, h.hexdigest()]
+        return h.hexdigest()
+
+    def path(self, path):
+        if not os.path.exists(path):
+            return None
+        if os.path.isdir(path):
+            return {os.path.relpath(os.path.join(root, name), path): self.file(os.path.join(root, name))
+                    for root, _, names in sorted(os.walk(path)) for name in sorted(names)}
+        return self.file(path)
+
+
+def stage_key(stage, hashes):
+    script = os.path.join(NOTEBOOKS_DIR, stage["script"])
+    payload = {
+        "code": {os.path.relpath(path, SRC_DIR): hashes.file(path) for path in code_files(script)},
+        "inputs": {path: hashes.path(path) for path in stage["inputs"]},
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+def _load_state():
+    try:
+        with open(STATE_PATH) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {"stages": {}, "files": {}}
+
+
+def _save_state(state):
+    os.makedirs(os.path.dirname(STATE_PATH), exist_ok=True)
+    with open(f"{STATE_PATH}.tmp", "w") as f:
+        json.dump(state, f, indent=1, sort_keys=True)
+    os.replace(f"{STATE_PATH}.tmp", STATE_PATH)
+
+
+# -----------------------------
+# Execution
+# -----------------------------
+# Step records of the stage carry its name (see instrumentation.stage_context)
+def _execute(name, stage, in_process):
+    script = os.path.join(NOTEBOOKS_DIR, stage["script"])
+    if in_process:
+        with stage_context(name):
+            runpy.run_path(script, run_name="__main__")
+    else:
+        subprocess.run([sys.executable, script], check=True, env={**os.environ, "CRIME_PIPELINE_STAGE": name})
+
+
+# Run the selected stages in dependency order, independent ones at the same time. A stage is skipped
+# when its code and inputs hash to the same key as its last successful run and its outputs exist.
+# In-process runs share written frames between stages instead of re-reading the files.
+def run_pipeline(stage_names=None, force=False, max_workers=2, in_process=True):
+    selected = list(stage_names or STAGES)
+    deps = {name: [d for d in needs if d in selected] for name, needs in dependencies().items() if name in selected}
+    state = _load_state()
+    state_lock = threading.Lock()
+    hashes = _FileHashes(state.setdefault("files", {}), state_lock)
+    results, done, failed = {}, set(), set()
+
+    def run_stage(name):
+        stage = STAGES[name]
+        start = time.perf_counter()
+        key = stage_key(stage, hashes)
+        if not force and state["stages"].get(name) == key and all(os.path.exists(p) for p in stage["outputs"]):
+            return {"stage": name, "status": "skipped", "seconds": time.perf_counter() - start}
+        print(f"[pipeline] running {name}")
+        _execute(name, stage, in_process)
+        with state_lock:
+            state["stages"][name] = key
+            _save_state(state)
+        return {"stage": name, "status": "ran", "seconds": time.perf_counter() - start}
+
+    if in_process:
+        storage.share_frames(True)
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="pipeline") as pool:
+            running = {}
+            while len(done) + len(failed) < len(deps):
+                for name, needs in deps.items():
+                    if name in done or name in failed or name in running.values():
+                        continue
+                    if any(d in failed for d in needs):
+                        failed.add(name)
+                        results[name] = {"stage": name, "status": "blocked", "seconds": 0.0}
+                    elif all(d in done for d in needs):
+                        running[pool.submit(run_stage, name)] = name
+                if not running:
+                    continue
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    try:
+                        results[name] = future.result()
+                        done.add(name)
+                    except Exception as e:
+                        print(f"[pipeline] {name} failed: {e!r}")
+                        results[name] = {"stage": name, "status": "failed", "seconds": 0.0}
+                        failed.add(name)
+    finally:
+        if in_process:
+            storage.share_frames(False)
+        with state_lock:
+            _save_state(state)
+
+    return pd.DataFrame([results[name] for name in selected if name in results])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the analysis stages (notebooks/01_ to 05_) as a cached DAG.")
+    parser.add_argument("stages", nargs="*", help="stage names (default: all)")
+    parser.add_argument("--force", action="store_true", help="run even if inputs and code are unchanged")
+    parser.add_argument("--jobs", type=int, default=2, help="stages run at the same time")
+    parser.add_argument("--processes", action="store_true", help="run each stage in its own Python process")
+    args = parser.parse_args()
+
+    summary = run_pipeline(args.stages, force=args.force, max_workers=args.jobs, in_process=not args.processes)
+    print(summary.to_string(index=False))
+    sys.exit(1 if summary["status"].isin(["failed", "blocked"]).any() else 0)
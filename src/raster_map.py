@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+
+from chart_renderer import chart
+
+WIDTH, HEIGHT = 800, 640  # pixel grid of the map image
+
+
+# Bin points onto a height x width pixel grid with vectorized index arithmetic and bincount.
+# Returns per-pixel counts and, when labels are given, each pixel's most frequent label (NaN where empty).
+def rasterize_points(x, y, labels=None, width=WIDTH, height=HEIGHT, extent=None):
+    x, y = np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64)
+    if extent is None:
+        extent = (float(x.min()), float(x.max()), float(y.min()), float(y.max()))
+    x0, x1, y0, y1 = extent
+    inside = (x >= x0) & (x <= x1) & (y >= y0) & (y <= y1)
+    ix = np.minimum(((x[inside] - x0) / ((x1 - x0) or 1.0) * width).astype(np.int64), width - 1)
+    iy = np.minimum(((y[inside] - y0) / ((y1 - y0) or 1.0) * height).astype(np.int64), height - 1)
+    pixel = iy * width + ix
+
+    counts = np.bincount(pixel, minlength=width * height).reshape(height, width)
+    result = {'counts': counts, 'dominant': None, 'extent': extent}
+    if labels is not None:
+        codes = np.asarray(labels, dtype=np.int64)[inside]
+        k = int(codes.max(initial=0)) + 1
+        per_label = np.bincount(pixel * k + codes, minlength=width * height * k).reshape(height, width, k)
+        dominant = per_label.argmax(axis=2).astype(np.float64)
+        dominant[counts == 0] = np.nan
+        result['dominant'] = dominant
+    return result
+
+
+# Map chart of many points drawn as one image: pixels colored by dominant cluster (labels given)
+# or by incident count (log scale). Only the pixel grid goes into the spec, so render time and
+# file size depend on the resolution, not on the number of incidents.
+def raster_chart(x, y, filename, title, labels=None, xlabel='Longitude', ylabel='Latitude',
+                 width=WIDTH, height=HEIGHT, overlay=None, overlay_label=None, **options):
+    raster = rasterize_points(x, y, labels, width, height)
+    if labels is not None:
+        grid, defaults = raster['dominant'], {'cmap': 'viridis', 'colorbar': 'Cluster'}
+    else:
+        grid, defaults = raster['counts'].astype(np.float64), {'cmap': 'YlOrRd', 'colorbar': 'Crimes per pixel', 'log': True}
+        grid[grid == 0] = np.nan
+    options = {**defaults, **options}
+    if overlay is not None:
+        options.update(overlay=overlay, overlay_label=overlay_label, x=overlay.columns[0], y=overlay.columns[1])
+    return chart('raster', pd.DataFrame(grid), filename, title, xlabel, ylabel,
+                 extent=list(raster['extent']), figsize=options.pop('figsize', (10, 8)), **options)
@@ -0,0 +1,148 @@
+import glob
+import hashlib
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: index updates are serialized within one process only
+    fcntl = None
+
+import pandas as pd
+
+CACHE_DIR = os.getenv("CRIME_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".cache", "warehouse"))
+CACHE_TTL_SECONDS = float(os.getenv("CRIME_CACHE_TTL_SECONDS", 24 * 60 * 60))  # views change at most once per data load
+CACHE_MAX_BYTES = int(os.getenv("CRIME_CACHE_MAX_BYTES", 512 * 1024 * 1024))
+
+
+# Disk cache of query results stored as Parquet files, with TTL and LRU eviction by total size.
+# index.json is shared by every process using the cache directory: each read-modify-write of it
+# holds an exclusive lock on index.json.lock, so concurrent runs don't lose each other's entries.
+class ResultCache:
+    def __init__(self, cache_dir=CACHE_DIR, ttl_seconds=CACHE_TTL_SECONDS, max_bytes=CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._index_path = os.path.join(cache_dir, "index.json")
+        self._lock_path = f"{self._index_path}.lock"
+        self._lock = threading.Lock()
+
+    # Key = table name + query parameters (limit, order, filters, ...)
+    @staticmethod
+    def make_key(table_name, params=None):
+        payload = json.dumps({"table": table_name, "params": params or {}}, sort_keys=True, default=str)
+        return f"{table_name}-{hashlib.sha1(payload.encode()).hexdigest()[:16]}"
+
+    def get(self, table_name, params=None):
+        key = self.make_key(table_name, params)
+        with self._locked():
+            index = self._load_index()
+            entry = index.get(key)
+            if entry is None:
+                return None
+            path = self._path(key)
+            if time.time() - entry["created"] > self.ttl_seconds or not os.path.exists(path):
+                self._remove(index, key)
+                self._save_index(index)
+                return None
+            entry["last_access"] = time.time()
+            self._save_index(index)
+        # Read outside the lock so large results don't block other lookups; a put or eviction
+        # (in this or another process) may remove the file in between, which is just a miss
+        try:
+            return pd.read_parquet(path)
+        except FileNotFoundError:
+            return None
+
+    def put(self, table_name, df, params=None):
+        key = self.make_key(table_name, params)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        df.to_parquet(tmp_path, index=False, compression="zstd")
+
+        with self._locked():
+            # Published under the lock, so every result file outside a locked section has an index entry
+            os.replace(tmp_path, path)  # atomic, readers never see a half-written file
+            index = self._load_index()
+            now = time.time()
+            index[key] = {"table": table_name, "created": now, "last_access": now, "size": os.path.getsize(path)}
+            self._evict(index)
+            self._save_index(index)
+
+    # Drop cached results for one table, or everything (e.g. after a warehouse reload)
+    def invalidate(self, table_name=None):
+        with self._locked():
+            index = self._load_index()
+            for key, entry in list(index.items()):
+                if table_name is None or entry["table"] == table_name:
+                    self._remove(index, key)
+            self._save_index(index)
+
+    # -----------------------------
+    # Internals
+    # -----------------------------
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.parquet")
+
+    # Exclusive across threads (threading lock) and processes (flock on the lock file)
+    @contextmanager
+    def _locked(self):
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(self._lock_path, "a") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _load_index(self):
+        try:
+            with open(self._index_path) as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _save_index(self, index):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = f"{self._index_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(index, f)
+        os.replace(tmp_path, self._index_path)
+
+    def _remove(self, index, key):
+        index.pop(key, None)
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def _evict(self, index):
+        now = time.time()
+        for key, entry in list(index.items()):
+            if now - entry["created"] > self.ttl_seconds:
+                self._remove(index, key)
+
+        # Least recently used entries go first until the cache fits in max_bytes
+        total = sum(entry["size"] for entry in index.values())
+        for key, entry in sorted(index.items(), key=lambda item: item[1]["last_access"]):
+            if total <= self.max_bytes:
+                break
+            total -= entry["size"]
+            self._remove(index, key)
+
+        # Result files without an entry (left by a process that died while publishing) are never read
+        for path in glob.glob(os.path.join(self.cache_dir, "*.parquet")):
+            key = os.path.basename(path)[:-len(".parquet")]
+            if key not in index:
+                self._remove(index, key)
+
+
+cache = ResultCache()
@@ -0,0 +1,174 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+from instrumentation import instrumented
+
+DIMENSIONS = ['YEAR', 'MONTH', 'DAY_OF_WEEK', 'HOUR', 'CRIME_TYPE', 'TOWN', 'SEVERITY']
+MARGINALS = ['SUBDIVISION']  # too many values for the cube; kept as 1-D counts from the same pass
+CHUNK_SIZE = 5_000_000  # rows per pass, bounds the int64 index array
+
+
+# Integer codes of a column and their labels; missing values get their own trailing label (None)
+def _codes(values):
+    values = pd.Series(values)
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        codes, labels = values.cat.codes.to_numpy(), values.cat.categories
+    else:
+        codes, labels = pd.factorize(values, sort=True)
+    labels = labels.tolist()
+    codes = codes.astype(np.int64)
+    if (codes < 0).any():
+        codes[codes < 0] = len(labels)
+        labels.append(None)
+    return codes, labels
+
+
+# Incident counts over year x month x day-of-week x hour x crime type x town x severity, built in one
+# pass over integer codes. Any marginal or slice is a sum over axes of the cube, so reports read counts
+# from here instead of grouping the incidents again. Only occupied cells are stored (one row of
+# dimension codes plus a count each): the full grid has ~12M cells, most of them empty.
+class RollupCube:
+    def __init__(self, cells, counts, labels, marginals=None):
+        self.cells = cells  # (occupied cells, dimensions) array of codes, one column per dimension
+        self.counts = counts  # incidents per occupied cell
+        self.labels = labels  # dimension -> list of labels (position = code)
+        self.marginals = marginals or {}  # column -> pd.Series of counts
+
+    @property
+    def dimensions(self):
+        return list(self.labels)
+
+    @classmethod
+    @instrumented('rollup_cube.from_frame', rows='df')
+    def from_frame(cls, df, dimensions=DIMENSIONS, marginals=MARGINALS, chunk_size=CHUNK_SIZE):
+        codes, labels = [], {}
+        for dim in dimensions:
+            dim_codes, labels[dim] = _codes(df[dim])
+            codes.append(dim_codes)
+        shape = tuple(len(labels[dim]) for dim in dimensions)
+
+        # Count the distinct flat cell indices of each chunk, then merge the chunks' cells
+        chunk_cells, chunk_counts = [], []
+        for lo in range(0, len(df), chunk_size):
+            flat = np.ravel_multi_index([c[lo:lo + chunk_size] for c in codes], shape)
+            cells, counts = np.unique(flat, return_counts=True)
+            chunk_cells.append(cells)
+            chunk_counts.append(counts)
+        flat, inverse = np.unique(np.concatenate(chunk_cells or [np.empty(0, np.int64)]), return_inverse=True)
+        counts = np.bincount(inverse, weights=np.concatenate(chunk_counts or [np.empty(0, np.int64)]), minlength=len(flat))
+
+        # Smallest unsigned types that hold the largest code / cell
+        cells = np.stack(np.unravel_index(flat, shape), axis=1).astype(np.min_scalar_type(max(max(shape, default=1) - 1, 1)))
+        counts = counts.astype(np.min_scalar_type(max(int(counts.max(initial=0)), 1)))
+
+        extra = {}
+        for col in marginals or []:
+            col_codes, col_labels = _codes(df[col])
+            extra[col] = pd.Series(np.bincount(col_codes, minlength=len(col_labels)), index=col_labels, name='count')
+        return cls(cells, counts, labels, extra)
+
+    def _axis_positions(self, dim, value):
+        values = value if isinstance(value, (list, tuple, set, np.ndarray, pd.Index)) else [value]
+        lookup = {label: pos for pos, label in enumerate(self.labels[dim])}
+        return [lookup[v] for v in values if v in lookup]
+
+    # Counts grouped by `by` (like df[where].groupby(by).size()); where = {dimension: value or list}
+    def totals(self, by=(), dropna=True, drop_empty=True, **where):
+        by = [by] if isinstance(by, str) else list(by)
+
+        # Output position of every code along each dimension (-1: filtered out by `where`)
+        positions = {}
+        keep = np.ones(len(self.counts), dtype=bool)
+        for dim, value in where.items():
+            selected = self._axis_positions(dim, value)
+            positions[dim] = np.full(len(self.labels[dim]), -1, dtype=np.int64)
+            positions[dim][selected] = np.arange(len(selected))
+            keep &= positions[dim][self.cells[:, self.dimensions.index(dim)]] >= 0
+        counts = self.counts[keep].astype(np.int64)
+        if not by:
+            return int(counts.sum())
+
+        out_shape = tuple(len(self.labels[dim]) if dim not in where else int((positions[dim] >= 0).sum()) for dim in by)
+        out_codes = []
+        for dim in by:
+            dim_codes = self.cells[keep, self.dimensions.index(dim)].astype(np.int64)
+            out_codes.append(positions[dim][dim_codes] if dim in where else dim_codes)
+        flat = np.ravel_multi_index(out_codes, out_shape)
+        summed = np.bincount(flat, weights=counts, minlength=int(np.prod(out_shape))).astype(np.int64)
+
+        labels = [
+            [self.labels[dim][p] for p in self._axis_positions(dim, where[dim])] if dim in where else self.labels[dim]
+            for dim in by
+        ]
+        result = pd.DataFrame({'CRIME_COUNT': summed}, index=pd.MultiIndex.from_product(labels, names=by))
+        result = result.reset_index()
+        if dropna:
+            result = result.dropna(subset=by)
+        if drop_empty:
+            result = result[result['CRIME_COUNT'] > 0]
+        return result.reset_index(drop=True)
+
+    # Same as df[column].value_counts() (most frequent first, missing values excluded)
+    def value_counts(self, column):
+        if column in self.marginals:
+            counts = self.marginals[column]
+        else:
+            counts = self.totals(column, drop_empty=False).set_index(column)['CRIME_COUNT']
+        counts = counts[counts.index.notna()]
+        return counts.sort_values(ascending=False, kind='stable').rename('count').rename_axis(column)
+
+    # -----------------------------
+    # Persistence
+    # -----------------------------
+    def save(self, path):
+        meta = {
+            'labels': self.labels,
+            'marginals': {col: {'labels': s.index.tolist(), 'counts': s.tolist()} for col, s in self.marginals.items()},
+        }
+        with open(path, 'wb') as f:  # file handle, so numpy doesn't append .npz to the name
+            np.savez_compressed(f, cells=self.cells, counts=self.counts, meta=np.array(json.dumps(meta, default=_json_default)))
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            cells, counts = data['cells'], data['counts']
+            meta = json.loads(str(data['meta']))
+        marginals = {col: pd.Series(m['counts'], index=m['labels'], name='count') for col, m in meta['marginals'].items()}
+        return cls(cells, counts, meta['labels'], marginals)
+
+
+DAY_NAMES = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+
+# Trend tables of the crime type trends report (notebook 05), shared with the scale benchmark
+@instrumented('rollup_cube.trend_reports')
+def trend_reports(cube):
+    # Crime count by day of week, with the day names for plotting
+    by_day = cube.totals('DAY_OF_WEEK')
+    by_day['DAY_NAME'] = by_day['DAY_OF_WEEK'].map(dict(enumerate(DAY_NAMES)))
+
+    # Crime count by month and year, plus a 12 x n_years matrix (rows = months, columns = years)
+    by_month_year = cube.totals(['YEAR', 'MONTH'])
+    by_month_year['YEAR_MONTH'] = pd.to_datetime(
+        by_month_year['YEAR'].astype(str) + '/' + by_month_year['MONTH'].astype(str) + '-01'
+    )
+    heatmap = by_month_year.pivot(index='MONTH', columns='YEAR', values='CRIME_COUNT').fillna(0)
+
+    return {
+        'by_day': by_day,
+        'by_month': cube.totals('MONTH'),
+        'by_year': cube.totals('YEAR'),
+        'by_month_year': by_month_year,
+        'month_year_heatmap': heatmap,
+        'by_crime_type': cube.totals('CRIME_TYPE'),
+    }
+
+
+def _json_default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    raise TypeError(f"Cannot store label {value!r}")
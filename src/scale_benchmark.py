@@ -0,0 +1,264 @@
+import argparse
+import json
+import os
+import platform
+import shutil
+import socket
+import subprocess
+import sys
+from datetime import datetime, timezone
+
+import pandas as pd
+import psutil
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import StandardScaler
+
+from config import BENCHMARK_DATA_DIR, BENCHMARK_HISTORY, PROJECT_ROOT
+from feature_encoding import encode_features
+from feature_store import DERIVED_FEATURES, FeatureStore
+from instrumentation import step
+from kmeans_sweep import sweep_k
+from rollup_cube import RollupCube, trend_reports
+from severity_model import FEATURES, TARGET, SeverityModel
+from storage import read_artifact
+from streaming_preprocessing import preprocess_csv_in_chunks
+from synthetic_data import parse_rows, write_synthetic
+from warehouse_backend import LocalBackend
+
+SIZES = ['1M', '10M', '100M']
+TOLERANCE = 0.25  # slower / bigger than the baseline by more than this fraction is a regression
+MIN_SLACK_SECONDS = 0.5  # ignore timing noise on very short stages
+BASELINE_RUNS = 5  # baseline = median of this many previous matching runs
+
+
+# -----------------------------
+# Stages
+# -----------------------------
+# Each stage works on a shared context (file paths, the cleaned incidents, fitted models)
+# and returns (rows processed, extra stats). Data a stage needs is loaded before its timer starts.
+# Stages call the same functions as the pipeline stages, so the suite measures the shipped code.
+def _generate(ctx):
+    write_synthetic(ctx['raw'], ctx['rows'], seed=ctx['seed'], duplicate_rate=0.001, missing_rate=0.001)
+    return ctx['rows'], {'raw_mb': os.path.getsize(ctx['raw']) / 1e6}
+
+
+# Chunked cleaning plus the temporal features of stage 02, computed into an empty feature store
+def _preprocess(ctx):
+    stats = preprocess_csv_in_chunks(ctx['raw'], ctx['cleaned'])
+    shutil.rmtree(ctx['features'], ignore_errors=True)
+    stats['features_added'] = FeatureStore(ctx['features']).update(read_artifact(ctx['cleaned']))
+    return stats['rows_read'], {**stats, 'cleaned_mb': os.path.getsize(ctx['cleaned']) / 1e6}
+
+
+# Label encoding, sparse one-hot and scaling of stage 02
+def _encode(ctx):
+    le_df, one_hot_df, one_hot, _ = encode_features(ctx['incidents'], sparse_one_hot=True)
+    ctx['coordinates'] = one_hot_df[['LATITUDE', 'LONGITUDE']].to_numpy()  # the clustering input of stage 03
+    return len(le_df), {'one_hot_columns': one_hot.shape[1]}
+
+
+def _kmeans_sweep(ctx):
+    if 'coordinates' not in ctx:
+        ctx['coordinates'] = StandardScaler().fit_transform(ctx['incidents'][['LATITUDE', 'LONGITUDE']])
+    sweep = sweep_k(ctx['coordinates'], k_values=range(1, 11), random_state=42)
+    return len(ctx['coordinates']), {'k_values': len(sweep)}
+
+
+def _severity_split(ctx):
+    if 'split' not in ctx:
+        df = ctx['incidents']
+        X_train, X_test, y_train, y_test = train_test_split(df[FEATURES], df[TARGET].astype(str), test_size=0.2, random_state=42)
+        if ctx['fit_rows'] and len(X_train) > ctx['fit_rows']:
+            X_train, y_train = X_train.iloc[:ctx['fit_rows']], y_train.iloc[:ctx['fit_rows']]
+        ctx['split'] = X_train, X_test, y_train, y_test
+    return ctx['split']
+
+
+def _severity_train(ctx):
+    X_train, _, y_train, _ = _severity_split(ctx)
+    ctx['model'] = SeverityModel.train(X_train, y_train, n_estimators=ctx['trees'], n_jobs=-1, random_state=42)
+    return len(X_train), {'trees': ctx['trees']}
+
+
+def _severity_inference(ctx):
+    X_train, X_test, y_train, y_test = _severity_split(ctx)
+    if 'model' not in ctx:
+        ctx['model'] = SeverityModel.train(X_train, y_train, n_estimators=ctx['trees'], n_jobs=-1, random_state=42)
+    y_pred = ctx['model'].predict(X_test)
+    return len(X_test), {'accuracy': float((y_pred == y_test.to_numpy()).mean())}
+
+
+# Cube build of stage 02 plus the stage 05 reports read from it
+def _trend_aggregation(ctx):
+    cube = RollupCube.from_frame(ctx['incidents'])
+    trend_reports(cube)
+    return len(ctx['incidents']), {'cube_cells': int(cube.counts.size)}
+
+
+# Local DuckDB warehouse as the dashboard backend builds it: star-schema load of the cleaned
+# artifact, rollups included
+def _warehouse_load(ctx):
+    backend = LocalBackend(source_path=ctx['cleaned'], db_path=':memory:', feature_store_path=ctx['features'])
+    try:
+        backend.connect()
+        stats = backend.load_stats
+    finally:
+        backend.close()
+    return stats['incidents'], {key: value for key, value in stats.items() if key.startswith('new_')}
+
+
+# name -> (function, needs the cleaned incidents in memory); stages after preprocessing also need the cleaned file
+STAGES = {
+    'generate': (_generate, False),
+    'preprocessing': (_preprocess, False),
+    'encoding': (_encode, True),
+    'kmeans_sweep': (_kmeans_sweep, True),
+    'severity_training': (_severity_train, True),
+    'severity_inference': (_severity_inference, True),
+    'trend_aggregation': (_trend_aggregation, True),
+    'warehouse_load': (_warehouse_load, False),
+}
+
+
+# -----------------------------
+# Measurement & history
+# -----------------------------
+def _measure(name, fn, ctx):
+    with step(f'benchmark.{name}', dataset_rows=ctx['rows']) as s:
+        s.rows, extra = fn(ctx)
+    record = s.record
+    return {
+        'rows_processed': int(record['rows']),
+        'wall_seconds': record['wall_seconds'],
+        'cpu_seconds': record['cpu_seconds'],  # this process only; worker processes are not included
+        'peak_rss_mb': record['peak_rss_mb'],
+        'rows_per_second': record['rows_per_second'],
+        'extra': extra,
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=PROJECT_ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def machine_info():
+    return {
+        'host': socket.gethostname(),
+        'platform': platform.platform(),
+        'python': platform.python_version(),
+        'cpus': os.cpu_count(),
+        'memory_gb': round(psutil.virtual_memory().total / 1e9, 1),
+    }
+
+
+def load_history(path=BENCHMARK_HISTORY):
+    if not os.path.exists(path):
+        return pd.DataFrame()
+    with open(path) as f:
+        return pd.DataFrame([json.loads(line) for line in f if line.strip()])
+
+
+def append_history(records, path=BENCHMARK_HISTORY):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'a') as f:
+        for record in records:
+            f.write(json.dumps(record, default=str) + '\n')
+
+
+# Compare a run with the median of earlier runs of the same stage, size, settings and machine;
+# returns one row per stage that got slower or used more memory than TOLERANCE allows
+def find_regressions(run, history, tolerance=TOLERANCE):
+    run = pd.DataFrame(run)
+    if history.empty or run.empty:
+        return pd.DataFrame()
+    earlier = history[history['run_id'] != run['run_id'].iloc[0]]
+    rows = []
+    for _, record in run.iterrows():
+        same = earlier[(earlier['stage'] == record['stage']) & (earlier['rows'] == record['rows'])
+                       & (earlier['host'] == record['host']) & (earlier['settings'] == record['settings'])]
+        if same.empty:
+            continue
+        baseline = same.sort_values('timestamp').tail(BASELINE_RUNS)
+        for metric, slack in [('wall_seconds', MIN_SLACK_SECONDS), ('peak_rss_mb', 0.0)]:
+            base = baseline[metric].median()
+            if record[metric] > base * (1 + tolerance) and record[metric] - base > slack:
+                rows.append({'stage': record['stage'], 'rows': record['rows'], 'metric': metric,
+                             'baseline': base, 'value': record[metric], 'ratio': record[metric] / base})
+    return pd.DataFrame(rows)
+
+
+# -----------------------------
+# Suite
+# -----------------------------
+# Generate (or reuse) a synthetic extract per size and run the selected stages on it in order.
+# In-memory stages hold the whole cleaned frame, so the largest sizes need a matching machine;
+# fit_rows caps the classifier's training rows independently of the dataset size.
+def run_suite(sizes=SIZES, stages=None, seed=42, trees=100, fit_rows=None, data_dir=BENCHMARK_DATA_DIR,
+              history_path=BENCHMARK_HISTORY, keep_data=True):
+    stages = [name for name in STAGES if name in (stages or STAGES)]  # always in suite order
+    run_id = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+    common = {'run_id': run_id, 'commit': _git_commit(), **machine_info()}
+    settings = json.dumps({'seed': seed, 'trees': trees, 'fit_rows': fit_rows}, sort_keys=True)
+    records = []
+
+    for size in sizes:
+        n_rows = parse_rows(size)
+        ctx = {
+            'rows': n_rows, 'seed': seed, 'trees': trees, 'fit_rows': fit_rows,
+            'raw': os.path.join(data_dir, f'synthetic_{n_rows}_{seed}.csv'),
+            'cleaned': os.path.join(data_dir, f'synthetic_{n_rows}_{seed}_cleaned.parquet'),
+            'features': os.path.join(data_dir, f'synthetic_{n_rows}_{seed}_features'),
+        }
+        for name in stages:
+            fn, needs_incidents = STAGES[name]
+            if name == 'generate' and os.path.exists(ctx['raw']):
+                continue  # same size and seed give the same file
+            if name != 'generate' and not os.path.exists(ctx['raw']):
+                _generate(ctx)
+            if name not in ('generate', 'preprocessing') and not (
+                    os.path.exists(ctx['cleaned']) and os.path.isdir(ctx['features'])):
+                _preprocess(ctx)
+            if needs_incidents and 'incidents' not in ctx:
+                ctx['incidents'] = FeatureStore(ctx['features']).attach(read_artifact(ctx['cleaned']), DERIVED_FEATURES)
+
+            print(f"[benchmark] {size} {name}")
+            record = {**common, 'timestamp': datetime.now(timezone.utc).isoformat(), 'stage': name,
+                      'rows': n_rows, 'settings': settings, **_measure(name, fn, ctx)}
+            records.append(record)
+            append_history([record], history_path)  # written as it goes, so a crash keeps finished stages
+
+        if not keep_data:
+            for path in (ctx['raw'], ctx['cleaned']):
+                if os.path.exists(path):
+                    os.remove(path)
+            shutil.rmtree(ctx['features'], ignore_errors=True)
+
+    return pd.DataFrame(records)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time and memory-profile every stage on synthetic data at several sizes")
+    parser.add_argument("--rows", nargs="+", default=SIZES, help="dataset sizes, e.g. 1M 10M 100M")
+    parser.add_argument("--stages", nargs="+", choices=list(STAGES), help="default: all")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--trees", type=int, default=100, help="random forest size for the severity stages")
+    parser.add_argument("--fit-rows", type=parse_rows, help="cap on severity training rows")
+    parser.add_argument("--history", default=BENCHMARK_HISTORY)
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    parser.add_argument("--drop-data", action="store_true", help="delete the synthetic files after each size")
+    args = parser.parse_args()
+
+    history = load_history(args.history)
+    results = run_suite(args.rows, args.stages, args.seed, args.trees, args.fit_rows,
+                        history_path=args.history, keep_data=not args.drop_data)
+    print(results[['stage', 'rows', 'wall_seconds', 'cpu_seconds', 'peak_rss_mb', 'rows_per_second']].to_string(index=False))
+
+    regressions = find_regressions(results, history, args.tolerance)
+    if not regressions.empty:
+        print("Regressions against earlier runs:")
+        print(regressions.to_string(index=False))
+        sys.exit(1)
@@ -0,0 +1,123 @@
+import pickle
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import ExtraTreesClassifier, HistGradientBoostingClassifier, RandomForestClassifier
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401 (enables HalvingRandomSearchCV)
+from sklearn.metrics import accuracy_score, f1_score
+from sklearn.model_selection import HalvingRandomSearchCV, train_test_split
+from sklearn.tree import DecisionTreeClassifier
+
+from instrumentation import PeakRSS
+from severity_model import FEATURES, TARGET, SeverityModel, fit_categories
+from storage import read_artifact
+
+LATENCY_REPEATS = 50
+
+
+# Candidate estimators with their hyperparameter search spaces; the first entry is the current
+# configuration from 04_crime_severity_classification.py (with parallel jobs)
+def default_candidates(random_state=42):
+    return {
+        'random_forest': (
+            RandomForestClassifier(n_estimators=100, class_weight='balanced', n_jobs=-1, random_state=random_state),
+            {'max_depth': [None, 12, 20], 'min_samples_leaf': [1, 2, 5], 'max_features': ['sqrt', 0.5]},
+        ),
+        'extra_trees': (
+            ExtraTreesClassifier(n_estimators=100, class_weight='balanced', n_jobs=-1, random_state=random_state),
+            {'max_depth': [None, 12, 20], 'min_samples_leaf': [1, 2, 5], 'max_features': ['sqrt', 0.5]},
+        ),
+        'hist_gradient_boosting': (
+            HistGradientBoostingClassifier(class_weight='balanced', random_state=random_state),
+            {'learning_rate': [0.05, 0.1, 0.2], 'max_leaf_nodes': [15, 31, 63], 'max_iter': [100, 200]},
+        ),
+        'decision_tree': (
+            DecisionTreeClassifier(class_weight='balanced', random_state=random_state),
+            {'max_depth': [8, 12, 20, None], 'min_samples_leaf': [1, 5, 20]},
+        ),
+    }
+
+
+# Successive halving: many configurations on a small sample, only the best survive to the full data
+def _search(estimator, param_grid, X, y, random_state):
+    search = HalvingRandomSearchCV(
+        estimator,
+        param_grid,
+        factor=3,
+        scoring='f1_macro',
+        cv=3,
+        random_state=random_state,
+        n_jobs=1 if getattr(estimator, 'n_jobs', None) == -1 else -1,  # don't nest parallelism
+    )
+    search.fit(X, y)
+    return search.best_estimator_, search.best_params_
+
+
+# Train every candidate on the same encoded feature matrix and record cost next to accuracy
+def run_benchmark(X_train, y_train, X_test, y_test, candidates=None, search=True, random_state=42):
+    candidates = candidates or default_candidates(random_state)
+    y_train, y_test = np.asarray(y_train).astype(str), np.asarray(y_test).astype(str)
+    rows = []
+
+    for name, (estimator, param_grid) in candidates.items():
+        best_params = {}
+        with PeakRSS() as memory:
+            start = time.perf_counter()
+            if search and param_grid:
+                model, best_params = _search(estimator, param_grid, X_train, y_train, random_state)
+            else:
+                model = estimator.fit(X_train, y_train)
+            fit_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        y_pred = model.predict(X_test)
+        batch_seconds = time.perf_counter() - start
+
+        # Single-incident latency (median over repeats)
+        one_row = X_test[:1]
+        latencies = []
+        for _ in range(LATENCY_REPEATS):
+            start = time.perf_counter()
+            model.predict(one_row)
+            latencies.append(time.perf_counter() - start)
+
+        labels = sorted(set(y_train))
+        per_class_f1 = f1_score(y_test, y_pred, labels=labels, average=None)
+        row = {
+            'model': name,
+            'accuracy': accuracy_score(y_test, y_pred),
+            'f1_macro': f1_score(y_test, y_pred, average='macro'),
+            'fit_seconds': fit_seconds,
+            'peak_memory_mb': memory.peak_bytes / 1e6,
+            'model_size_mb': len(pickle.dumps(model)) / 1e6,
+            'latency_ms': np.median(latencies) * 1e3,
+            'batch_rows_per_second': len(X_test) / batch_seconds if batch_seconds > 0 else np.inf,
+            'best_params': best_params,
+        }
+        row.update({f'f1_{label}': score for label, score in zip(labels, per_class_f1)})
+        rows.append(row)
+        print(f"{name}: f1_macro={row['f1_macro']:.3f} fit={fit_seconds:.1f}s size={row['model_size_mb']:.1f}MB")
+
+    return pd.DataFrame(rows).sort_values('f1_macro', ascending=False).reset_index(drop=True)
+
+
+# Cheapest model (by fit time, then latency) that meets the accuracy bar
+def pick_cheapest(results, min_f1_macro, cost_columns=('fit_seconds', 'latency_ms')):
+    eligible = results[results['f1_macro'] >= min_f1_macro]
+    if eligible.empty:
+        return None
+    return eligible.sort_values(list(cost_columns)).iloc[0]
+
+
+if __name__ == "__main__":
+    df = read_artifact(sys.argv[1], columns=FEATURES + [TARGET])
+    X_train_df, X_test_df, y_train, y_test = train_test_split(df[FEATURES], df[TARGET], test_size=0.2, random_state=42)
+
+    # Encode once with frozen categories so every candidate sees the same matrix
+    encoder = SeverityModel(categories=fit_categories(X_train_df))
+    results = run_benchmark(encoder.encode(X_train_df), y_train, encoder.encode(X_test_df), y_test)
+    print(results.drop(columns='best_params').to_string())
+    if len(sys.argv) > 2:
+        results.to_csv(sys.argv[2], index=False)
@@ -0,0 +1,99 @@
+import os
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+
+from instrumentation import instrumented
+
+CATEGORICAL_FEATURES = ['TOWN', 'SUBDIVISION', 'CRIME_TYPE']
+FEATURES = ['LATITUDE', 'LONGITUDE', 'TOWN', 'SUBDIVISION', 'CRIME_TYPE', 'HOUR', 'DAY_OF_WEEK', 'MONTH', 'IS_PEAK_HOUR', 'IS_WEEKEND']
+TARGET = 'SEVERITY'
+UNKNOWN_CODE = -1  # categories not seen during training
+BATCH_SIZE = 100_000
+
+
+# Frozen category lists (position = code) learned from the training data
+def fit_categories(df):
+    return {col: sorted(pd.Series(df[col]).dropna().astype(str).unique()) for col in CATEGORICAL_FEATURES}
+
+
+# Severity classifier packaged with its frozen category encoders, so codes are the same in every run
+# and at scoring time. Features are the raw cleaned columns (category names, unscaled coordinates).
+class SeverityModel:
+    def __init__(self, estimator=None, categories=None, classes=None):
+        self.estimator = estimator
+        self.categories = categories or {}  # column -> list of category names (position = code)
+        self.classes = classes
+        self.last_stats = {}
+
+    @classmethod
+    @instrumented('severity_model.train', rows='df')
+    def train(cls, df, y, n_estimators=100, n_jobs=-1, random_state=42, estimator=None):
+        model = cls(categories=fit_categories(df))
+        if estimator is None:
+            estimator = RandomForestClassifier(
+                n_estimators=n_estimators,
+                random_state=random_state,
+                class_weight='balanced',  # automatically balances classes
+                n_jobs=n_jobs  # trees are built on all cores
+            )
+        model.estimator = estimator.fit(model.encode(df), np.asarray(y))
+        model.classes = model.estimator.classes_.tolist()
+        return model
+
+    # Category names -> frozen codes; unseen categories map to UNKNOWN_CODE
+    def encode(self, df):
+        X = pd.DataFrame(index=df.index)
+        for col in FEATURES:
+            if col in self.categories:
+                codes = pd.Categorical(df[col].astype(str), categories=self.categories[col]).codes
+                X[col] = np.where(codes < 0, UNKNOWN_CODE, codes).astype(np.int32)
+            else:
+                X[col] = df[col].astype(np.float64)
+        return X.to_numpy(dtype=np.float32)  # trees compare float32 thresholds
+
+    # Score a large batch chunk by chunk on all cores; throughput is kept in last_stats
+    @instrumented('severity_model.predict_proba', rows='df')
+    def predict_proba(self, df, batch_size=BATCH_SIZE, n_jobs=-1):
+        start = time.perf_counter()
+        # n_jobs applies to this call only; the estimator keeps its own setting
+        previous_n_jobs = getattr(self.estimator, 'n_jobs', None)
+        if hasattr(self.estimator, 'n_jobs'):
+            self.estimator.n_jobs = n_jobs
+        try:
+            proba = np.empty((len(df), len(self.classes)))
+            for lo in range(0, len(df), batch_size):
+                chunk = df.iloc[lo:lo + batch_size]
+                proba[lo:lo + len(chunk)] = self.estimator.predict_proba(self.encode(chunk))
+        finally:
+            if hasattr(self.estimator, 'n_jobs'):
+                self.estimator.n_jobs = previous_n_jobs
+        seconds = time.perf_counter() - start
+        self.last_stats = {'rows': len(df), 'seconds': seconds, 'rows_per_second': len(df) / seconds if seconds > 0 else np.inf}
+        return proba
+
+    def predict(self, df, batch_size=BATCH_SIZE, n_jobs=-1):
+        proba = self.predict_proba(df, batch_size, n_jobs)
+        return np.asarray(self.classes)[proba.argmax(axis=1)]
+
+    def feature_importances(self):
+        return pd.DataFrame(
+            {'Feature': FEATURES, 'Importance': self.estimator.feature_importances_}
+        ).sort_values(by='Importance', ascending=False)
+
+    # -----------------------------
+    # Persistence
+    # -----------------------------
+    # Saved uncompressed, which loads fastest. The forest is not memory-mapped on load: sklearn's Tree
+    # copies its node arrays when unpickled, so each process holds its own copy of the trees.
+    def save(self, path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        joblib.dump({'estimator': self.estimator, 'categories': self.categories, 'classes': self.classes}, path)
+
+    @classmethod
+    def load(cls, path, mmap_mode=None):
+        state = joblib.load(path, mmap_mode=mmap_mode)
+        return cls(state['estimator'], state['categories'], state['classes'])
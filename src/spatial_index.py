@@ -0,0 +1,137 @@
+import sys
+
+import joblib
+import numpy as np
+import pandas as pd
+from scipy.spatial import cKDTree
+from storage import read_artifact
+
+KM_PER_DEG_LAT = 110.574
+KM_PER_DEG_LON_EQUATOR = 111.320
+FILTER_COLUMNS = {'crime_type': 'CRIME_TYPE', 'severity': 'SEVERITY'}
+
+
+# KD-tree over incident coordinates for radius, k-nearest and bounding-box queries.
+# Coordinates are projected to km around the dataset's mean latitude (accurate at city scale),
+# so radius queries take kilometres. Queries can be filtered by crime type, severity and date range.
+class SpatialIndex:
+    def __init__(self, lat, lon, codes, categories, dates, incident_ids=None):
+        self.lat = np.asarray(lat, dtype=np.float64)
+        self.lon = np.asarray(lon, dtype=np.float64)
+        self.codes = codes            # {'CRIME_TYPE': int array, 'SEVERITY': int array}
+        self.categories = categories  # {'CRIME_TYPE': [names], ...}
+        self.dates = dates            # datetime64[D] as int64 days, or None
+        self.incident_ids = incident_ids
+
+        self.lat0 = float(self.lat.mean()) if len(self.lat) else 0.0
+        self.tree = cKDTree(self._project(self.lat, self.lon))
+
+    @classmethod
+    def from_frame(cls, df):
+        codes, categories = {}, {}
+        for col in FILTER_COLUMNS.values():
+            if col in df:
+                cat = df[col].astype('category')
+                codes[col] = cat.cat.codes.to_numpy()
+                categories[col] = list(cat.cat.categories)
+        dates = None
+        if 'DATE' in df:
+            dates = pd.to_datetime(df['DATE']).to_numpy().astype('datetime64[D]').astype(np.int64)
+        incident_ids = df['INCIDENT_ID'].to_numpy() if 'INCIDENT_ID' in df else None
+        return cls(df['LATITUDE'].to_numpy(), df['LONGITUDE'].to_numpy(), codes, categories, dates, incident_ids)
+
+    # -----------------------------
+    # Persistence
+    # -----------------------------
+    # Stored as plain arrays + the built tree, so loading skips the build (and doesn't depend on
+    # how this module was imported when the index was saved)
+    def save(self, path):
+        joblib.dump(dict(self.__dict__), path)
+
+    @classmethod
+    def load(cls, path, mmap_mode='r'):
+        index = cls.__new__(cls)
+        index.__dict__.update(joblib.load(path, mmap_mode=mmap_mode))
+        return index
+
+    # -----------------------------
+    # Queries
+    # -----------------------------
+    def radius_count(self, lat, lon, radius_km, **filters):
+        if not self._has_filters(filters):
+            return int(self.tree.query_ball_point(self._project(lat, lon), radius_km, return_length=True))
+        return len(self.radius_query(lat, lon, radius_km, **filters))
+
+    # Row positions of incidents within radius_km of (lat, lon)
+    def radius_query(self, lat, lon, radius_km, **filters):
+        idx = np.asarray(self.tree.query_ball_point(self._project(lat, lon), radius_km), dtype=np.int64)
+        return idx[self._mask(idx, filters)]
+
+    # k nearest incidents matching the filters, as (row positions, distances in km)
+    def nearest(self, lat, lon, k=10, **filters):
+        point = self._project(lat, lon)
+        n = len(self.lat)
+        k_query = k
+        while True:
+            # Widen the search until enough incidents pass the filters (or everything was looked at)
+            dist, idx = self.tree.query(point, k=min(k_query, n))
+            dist, idx = np.atleast_1d(dist), np.atleast_1d(idx)
+            keep = self._mask(idx, filters)
+            if keep.sum() >= k or k_query >= n:
+                return idx[keep][:k], dist[keep][:k]
+            k_query *= 4
+
+    def bbox_query(self, min_lat, min_lon, max_lat, max_lon, **filters):
+        # Candidates from the square (Chebyshev ball) around the box centre, then the exact box test
+        corner_lo, corner_hi = self._project(min_lat, min_lon), self._project(max_lat, max_lon)
+        half_side = (corner_hi - corner_lo).max() / 2
+        idx = np.asarray(self.tree.query_ball_point((corner_lo + corner_hi) / 2, half_side * (1 + 1e-9), p=np.inf), dtype=np.int64)
+        lat, lon = self.lat[idx], self.lon[idx]
+        idx = idx[(lat >= min_lat) & (lat <= max_lat) & (lon >= min_lon) & (lon <= max_lon)]
+        return idx[self._mask(idx, filters)]
+
+    def bbox_count(self, min_lat, min_lon, max_lat, max_lon, **filters):
+        return len(self.bbox_query(min_lat, min_lon, max_lat, max_lon, **filters))
+
+    # -----------------------------
+    # Internals
+    # -----------------------------
+    def _project(self, lat, lon):
+        lat, lon = np.asarray(lat, dtype=np.float64), np.asarray(lon, dtype=np.float64)
+        x = lon * KM_PER_DEG_LON_EQUATOR * np.cos(np.radians(self.lat0))
+        y = lat * KM_PER_DEG_LAT
+        return np.stack([x, y], axis=-1)
+
+    @staticmethod
+    def _has_filters(filters):
+        return any(value is not None for value in filters.values())
+
+    # filters: crime_type=, severity= (a name or list of names), date_from=, date_to= (inclusive)
+    def _mask(self, idx, filters):
+        mask = np.ones(len(idx), dtype=bool)
+        for name, value in filters.items():
+            if value is None:
+                continue
+            if name in FILTER_COLUMNS:
+                col = FILTER_COLUMNS[name]
+                names = [value] if isinstance(value, str) else list(value)
+                wanted = [self.categories[col].index(v) for v in names if v in self.categories[col]]
+                mask &= np.isin(self.codes[col][idx], wanted)
+            elif name in ('date_from', 'date_to'):
+                day = pd.Timestamp(value).to_datetime64().astype('datetime64[D]').astype(np.int64)
+                mask &= self.dates[idx] >= day if name == 'date_from' else self.dates[idx] <= day
+            else:
+                raise ValueError(f"Unknown filter: {name}")
+        return mask
+
+
+# Build the index from the cleaned incidents artifact (raw, unscaled coordinates) and persist it
+def build_index(cleaned_path, index_path):
+    df = read_artifact(cleaned_path, columns=['INCIDENT_ID', 'LATITUDE', 'LONGITUDE', 'CRIME_TYPE', 'SEVERITY', 'DATE'])
+    index = SpatialIndex.from_frame(df)
+    index.save(index_path)
+    return index
+
+
+if __name__ == "__main__":
+    build_index(sys.argv[1], sys.argv[2])
@@ -0,0 +1,131 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import scipy.sparse as sp
+
+from instrumentation import step
+
+COMPRESSION = "zstd"
+
+# Frames shared between pipeline stages run in one process (absolute path -> DataFrame);
+# None outside a pipeline run, so standalone scripts always read the files
+_shared = None
+
+
+# Enabled by src/pipeline.py for the duration of a run
+def share_frames(enabled=True):
+    global _shared
+    _shared = {} if enabled else None
+
+
+def _shared_get(path, columns=None):
+    if _shared is None:
+        return None
+    df = _shared.get(os.path.abspath(path))
+    if df is None:
+        return None
+    return (df[columns] if columns is not None else df).copy()  # callers may modify their frame
+
+
+def _shared_put(path, df):
+    if _shared is not None:
+        _shared[os.path.abspath(path)] = df.copy().reset_index(drop=True)
+
+
+# Write a pipeline artifact as Parquet; pandas 'category' columns become dictionary-encoded Arrow columns
+def write_artifact(df, path, categorical_cols=None, compression=COMPRESSION):
+    with step("storage.write_artifact", rows=len(df), path=os.path.basename(path)):
+        if categorical_cols:
+            df = df.astype({col: "category" for col in categorical_cols})
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        pq.write_table(table, tmp_path, compression=compression, use_dictionary=True)
+        os.replace(tmp_path, path)
+    _shared_put(path, df)
+    return path
+
+
+# Raw CSV extract; parsed once per pipeline run when several stages read it
+def read_raw_csv(path):
+    df = _shared_get(path)
+    if df is None:
+        with step("storage.read_raw_csv", path=os.path.basename(path)) as s:
+            df = pd.read_csv(path)
+            s.rows = len(df)
+        _shared_put(path, df)
+    return df
+
+
+# Read only the requested columns, memory-mapping the file instead of copying it into a read buffer.
+# Falls back to the CSV with the same name for artifacts that have not been converted yet.
+def read_artifact(path, columns=None, memory_map=True):
+    shared = _shared_get(path, columns)
+    if shared is not None:
+        return shared
+    csv_path = os.path.splitext(path)[0] + ".csv"
+    if not os.path.exists(path) and not os.path.exists(csv_path):
+        raise FileNotFoundError(path)
+
+    with step("storage.read_artifact", path=os.path.basename(path), columns=len(columns) if columns else None) as s:
+        if os.path.exists(path):
+            df = pq.read_table(path, columns=columns, memory_map=memory_map).to_pandas()
+        else:
+            df = pd.read_csv(csv_path, usecols=columns)
+        s.rows = len(df)
+    return df
+
+
+# Column names of an artifact, read from the Parquet footer without loading any data
+def artifact_columns(path):
+    return pq.read_schema(path).names
+
+
+# One-off conversion of an existing CSV artifact to Parquet
+def convert_csv_artifact(csv_path, categorical_cols=None):
+    parquet_path = os.path.splitext(csv_path)[0] + ".parquet"
+    return write_artifact(pd.read_csv(csv_path), parquet_path, categorical_cols)
+
+
+# -----------------------------
+# Sparse (one-hot) blocks
+# -----------------------------
+# Save a sparse matrix in CSR form together with its column names in one compressed .npz file
+def write_sparse_artifact(matrix, columns, path):
+    with step("storage.write_sparse_artifact", rows=matrix.shape[0], path=os.path.basename(path)):
+        matrix = sp.csr_matrix(matrix)
+        if np.isin(matrix.data, (0, 1)).all():
+            matrix = matrix.astype(np.uint8)  # one-hot indicators fit in a byte
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = f"{path}.tmp.npz"
+        np.savez_compressed(
+            tmp_path,
+            data=matrix.data,
+            indices=matrix.indices,
+            indptr=matrix.indptr,
+            shape=np.array(matrix.shape),
+            columns=np.array(columns, dtype=str),
+        )
+        os.replace(tmp_path, path)
+    return path
+
+
+# Returns (csr_matrix, column_names)
+def read_sparse_artifact(path):
+    with step("storage.read_sparse_artifact", path=os.path.basename(path)) as s, np.load(path) as f:
+        matrix = sp.csr_matrix((f["data"], f["indices"], f["indptr"]), shape=tuple(f["shape"]))
+        s.rows = matrix.shape[0]
+        return matrix, [str(col) for col in f["columns"]]
+
+
+# Dense numeric columns + sparse one-hot block as one CSR feature matrix, ready for scikit-learn estimators
+def load_feature_matrix(dense_path, sparse_path, dense_columns=None, dtype=np.float64):
+    dense = read_artifact(dense_path, columns=dense_columns)
+    if dense_columns is None:
+        dense = dense.select_dtypes(include=["number", "bool"])  # e.g. skip DATE
+    onehot, onehot_columns = read_sparse_artifact(sparse_path)
+    X = sp.hstack([sp.csr_matrix(dense.to_numpy(dtype=dtype)), onehot.astype(dtype)], format="csr")
+    return X, list(dense.columns) + onehot_columns
@@ -0,0 +1,118 @@
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from feature_store import DERIVED_FEATURES
+from instrumentation import instrumented
+
+CHUNK_SIZE = 200_000
+CATEGORICAL_COLS = ['TOWN', 'TOWN_RISK_LEVEL', 'SUBDIVISION', 'SUBDIVISION_RISK_LEVEL', 'CRIME_TYPE', 'SEVERITY', 'RISK_ZONE', 'SOURCE']
+
+
+# Set of 64-bit row fingerprints kept as a few sorted numpy arrays (8 bytes per row).
+# Arrays of similar size are merged as they are added, so lookups stay O(log n) per level.
+class FingerprintSet:
+    def __init__(self):
+        self._levels = []
+
+    def __len__(self):
+        return sum(len(level) for level in self._levels)
+
+    def contains(self, hashes):
+        found = np.zeros(len(hashes), dtype=bool)
+        for level in self._levels:
+            pos = np.searchsorted(level, hashes)
+            pos[pos == len(level)] = 0
+            found |= level[pos] == hashes
+        return found
+
+    def add(self, hashes):
+        if len(hashes) == 0:
+            return  # an empty level would break the lookups in contains
+        new = np.unique(hashes)
+        while self._levels and len(self._levels[-1]) <= len(new):
+            new = np.union1d(self._levels.pop(), new)
+        self._levels.append(new)
+
+
+# Hash every row; numeric columns are hashed as float64 so an int column that turned float
+# in one chunk (read_csv infers dtypes per chunk) still matches its duplicate in another
+def row_fingerprints(chunk):
+    numeric = chunk.select_dtypes(include='number').columns
+    return pd.util.hash_pandas_object(chunk.astype({col: 'float64' for col in numeric}), index=False).to_numpy()
+
+
+# Clean the raw incident CSV chunk by chunk; peak memory is set by chunk_size. Derived temporal
+# features are not kept (extracts that carry them, like the synthetic one, have them dropped): the
+# feature store computes them once per new incident, attach them with FeatureStore.attach.
+# Output is appended to a Parquet file (categoricals dictionary-encoded) or a CSV, by extension.
+@instrumented('streaming_preprocessing.preprocess_csv_in_chunks', rows=lambda stats: stats['rows_read'])
+def preprocess_csv_in_chunks(raw_path, output_path, chunk_size=CHUNK_SIZE):
+    stats = {'rows_read': 0, 'rows_written': 0, 'dropped_missing': 0, 'dropped_duplicates': 0, 'chunks': 0}
+    seen = FingerprintSet()
+    as_parquet = output_path.endswith('.parquet')
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    tmp_path = f"{output_path}.tmp"
+    writer = None
+    schema = None
+
+    try:
+        for chunk in pd.read_csv(raw_path, chunksize=chunk_size):
+            stats['chunks'] += 1
+            stats['rows_read'] += len(chunk)
+
+            # Handle Missing Values & Duplicates
+            before = len(chunk)
+            chunk = chunk.dropna()
+            stats['dropped_missing'] += before - len(chunk)
+
+            hashes = row_fingerprints(chunk)
+            keep = ~pd.Series(hashes).duplicated().to_numpy() & ~seen.contains(hashes)
+            stats['dropped_duplicates'] += int((~keep).sum())
+            chunk = chunk[keep]
+            seen.add(hashes[keep])
+
+            # Correct Data Types
+            chunk = chunk.drop(columns=[col for col in DERIVED_FEATURES if col in chunk])
+            chunk['DATE'] = pd.to_datetime(chunk['DATE'], format='%Y-%m-%d', errors='coerce')
+            cat_cols = [col for col in CATEGORICAL_COLS if col in chunk]
+            chunk[cat_cols] = chunk[cat_cols].astype('category')
+
+            if as_parquet:
+                if writer is None:
+                    # int32 dictionary indices so every chunk fits the first chunk's schema
+                    schema = pa.Table.from_pandas(chunk, preserve_index=False).schema
+                    for col in cat_cols:
+                        idx = schema.get_field_index(col)
+                        schema = schema.set(idx, pa.field(col, pa.dictionary(pa.int32(), pa.string())))
+                    writer = pq.ParquetWriter(tmp_path, schema, compression='zstd')
+                writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+            else:
+                chunk.to_csv(tmp_path, mode='w' if stats['chunks'] == 1 else 'a', header=stats['chunks'] == 1, index=False)
+            stats['rows_written'] += len(chunk)
+    except BaseException:
+        if writer is not None:
+            writer.close()
+            writer = None
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)  # don't leave a half-written output behind
+        raise
+    finally:
+        if writer is not None:
+            writer.close()
+
+    if stats['chunks']:
+        os.replace(tmp_path, output_path)
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Chunked cleaning of the raw crime CSV")
+    parser.add_argument("raw_path")
+    parser.add_argument("output_path", help=".parquet or .csv")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    args = parser.parse_args()
+    print(preprocess_csv_in_chunks(args.raw_path, args.output_path, args.chunk_size))
@@ -1,19 +1,207 @@
 import os
-from dotenv import load_dotenv
-from supabase import create_client
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 import pandas as pd
+from result_cache import cache
 
-load_dotenv()  # loads .env
+REQUEST_TIMEOUT = float(os.getenv("SUPABASE_TIMEOUT", 30))  # seconds per HTTP request
 
-url = os.getenv("SUPABASE_URL")
-key = os.getenv("SUPABASE_KEY")
+_client = None
+_client_lock = threading.Lock()
+
+
+# One shared client, created on first use so importing this module needs no credentials or network;
+# its HTTP connection pool is reused by every fetch and worker thread
+def get_client():
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                from dotenv import load_dotenv
+                from supabase import ClientOptions, create_client
+
+                load_dotenv()  # loads .env
+                _client = create_client(
+                    os.getenv("SUPABASE_URL"),
+                    os.getenv("SUPABASE_KEY"),
+                    options=ClientOptions(postgrest_client_timeout=REQUEST_TIMEOUT),
+                )
+    return _client
+
+
+# PostgREST error codes of a transient failure: statement timeout, and the database being
+# unreachable (PGRST000-PGRST003, answered with 503 / 504)
+TRANSIENT_API_CODES = {"57014", "PGRST000", "PGRST001", "PGRST002", "PGRST003"}
+
+
+# Errors worth retrying: a request that timed out or failed in transit, or a transient error response
+# from PostgREST (5xx or 429, whose code is the HTTP status when the body is not PostgREST JSON, or one
+# of TRANSIENT_API_CODES). A bad query, missing view or auth error fails on the first attempt.
+# Imported on use like the client; without it installed only the local backend is in use.
+def is_retryable(error):
+    if isinstance(error, (ConnectionError, TimeoutError)):
+        return True
+    try:
+        import httpx
+        from postgrest.exceptions import APIError
+    except ImportError:
+        return False
+    if isinstance(error, httpx.TransportError):
+        return True
+    if isinstance(error, APIError):
+        code = str(error.code)
+        return code in TRANSIENT_API_CODES or code == "429" or (len(code) == 3 and code.startswith("5"))
+    return False
+
+
+PAGE_SIZE = 1000  # Supabase's default max rows per request
+MAX_WORKERS = 4   # pages in flight at the same time
+
+# Filter operators pushed down to PostgREST, as (column, op, value) tuples
+FILTER_OPS = ("eq", "neq", "gt", "gte", "lt", "lte", "in")
+
+
+# Dates and numpy scalars -> JSON-serializable values
+def _plain(value):
+    if isinstance(value, (list, tuple, set)):
+        return [_plain(v) for v in value]
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    if hasattr(value, "item"):
+        return value.item()
+    return value
+
+
+def check_filters(filters):
+    filters = [tuple(f) for f in filters or []]
+    for column, op, _ in filters:
+        if op not in FILTER_OPS:
+            raise ValueError(f"Unsupported filter op {op!r} on {column}, expected one of {FILTER_OPS}")
+    return filters
+
+
+# Fetch rows [start, end] (inclusive) of a table; only the selected columns and matching rows are sent
+def _fetch_range(table_name, start, end, order_by=None, count=False, columns=None, filters=None, descending=False):
+    query = get_client().table(table_name).select(",".join(columns) if columns else "*", count="exact" if count else None)
+    for column, op, value in filters or []:
+        query = getattr(query, "in_" if op == "in" else op)(column, _plain(value))
+    if order_by:
+        query = query.order(order_by, desc=descending)
+    return query.range(start, end).execute()
+
+
+# Yield a table page by page as DataFrame chunks
+def iter_table_pages(table_name, limit=None, page_size=PAGE_SIZE, max_workers=MAX_WORKERS,
+                     order_by=None, stats=None, columns=None, filters=None, descending=False):
+    # stats (optional dict) is filled with the number of rows and pages fetched.
+    # Pass order_by (e.g. the primary key) for plain tables, otherwise Postgres does
+    # not guarantee a stable row order between range requests.
+    fetch = partial(_fetch_range, table_name, order_by=order_by, columns=columns,
+                    filters=check_filters(filters), descending=descending)
+    if stats is None:
+        stats = {}
+    stats.update(table=table_name, rows=0, pages=0, total_rows=None)
+
+    first_size = page_size if limit is None else min(page_size, limit)
+    if first_size <= 0:
+        return
+
+    # The first page also asks for the exact row count so the remaining pages can be planned
+    first = fetch(0, first_size - 1, count=True)
+    total = first.count
+    if total is None:
+        total = len(first.data) if len(first.data) < first_size else None
+    if total is not None and limit is not None:
+        total = min(total, limit)
+    stats["total_rows"] = total
+
+    # If the server caps rows per request below page_size, follow the server's page size
+    if total is not None and 0 < len(first.data) < min(first_size, total):
+        page_size = len(first.data)
+
+    stats["rows"] += len(first.data)
+    stats["pages"] += 1
+    yield pd.DataFrame(first.data)
+
+    if total is None:
+        # No row count available: read sequentially until a short page comes back
+        start = len(first.data)
+        while len(first.data) == page_size and (limit is None or start < limit):
+            end = start + page_size - 1 if limit is None else min(start + page_size, limit) - 1
+            first = fetch(start, end)
+            stats["rows"] += len(first.data)
+            stats["pages"] += 1
+            start += len(first.data)
+            yield pd.DataFrame(first.data)
+        return
+
+    starts = iter(range(stats["rows"], total, page_size))
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        # Keep at most max_workers pages in flight so memory stays bounded by the window
+        pending = deque()
+
+        def submit_next():
+            start = next(starts, None)
+            if start is not None:
+                end = min(start + page_size, total) - 1
+                pending.append(pool.submit(fetch, start, end))
+
+        for _ in range(max_workers):
+            submit_next()
+
+        while pending:
+            response = pending.popleft().result()
+            submit_next()
+            stats["rows"] += len(response.data)
+            stats["pages"] += 1
+            yield pd.DataFrame(response.data)
 
-supabase = create_client(url, key)
 
 # Functions to fetch tables
-def fetch_table(table_name, limit=None):
-    query = supabase.table(table_name).select("*")
-    if limit:
-        query = query.limit(limit)
-    response = query.execute()
-    return pd.DataFrame(response.data)
+def fetch_table(table_name, limit=None, page_size=PAGE_SIZE, max_workers=MAX_WORKERS,
+                order_by=None, stats=None, use_cache=True, columns=None, filters=None, descending=False):
+    # Results are served from the local disk cache when a fresh copy exists;
+    # call cache.invalidate() after reloading the warehouse
+    params = {"limit": limit, "order_by": order_by, "columns": columns, "filters": _plain(check_filters(filters)),
+              "descending": descending}
+    if use_cache:
+        cached = cache.get(table_name, params)
+        if cached is not None:
+            if stats is not None:
+                stats.update(table=table_name, rows=len(cached), pages=0, total_rows=len(cached), cached=True)
+            return cached
+
+    # Reads all pages and concatenates them once at the end
+    chunks = list(iter_table_pages(table_name, limit, page_size, max_workers, order_by, stats,
+                                   columns, filters, descending))
+    df = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame(columns=columns)
+    if columns and df.empty:
+        df = df.reindex(columns=columns)  # an empty page has no columns; cache the requested ones
+    if use_cache:
+        cache.put(table_name, df, params)
+    return df
+
+
+# Row counts per group computed in the database (group_counts() in crime_data_warehouse_setup.sql);
+# only one row per group crosses the network
+def count_by(table_name, group_by, filters=None, use_cache=True):
+    group_by = list(group_by)
+    filters = check_filters(filters)
+    params = {"group_by": group_by, "filters": _plain(filters)}
+    if use_cache:
+        cached = cache.get(table_name, params)
+        if cached is not None:
+            return cached
+
+    payload = {
+        "table_name": table_name,
+        "group_cols": group_by,
+        "filters": [{"column": column, "op": op, "value": _plain(value)} for column, op, value in filters],
+    }
+    rows = get_client().rpc("group_counts", payload).execute().data
+    df = pd.DataFrame(rows, columns=group_by + ["crime_count"])
+    if use_cache:
+        cache.put(table_name, df, params)
+    return df
@@ -0,0 +1,232 @@
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Column order of temp_crime_data (sql/crime_data_warehouse_setup.sql)
+COLUMNS = [
+    'INCIDENT_ID', 'TOWN', 'TOWN_RISK_LEVEL', 'TOWN_PRIORITY_RANK', 'SUBDIVISION', 'SUBDIVISION_RISK_LEVEL',
+    'SUBDIVISION_PRIORITY_RANK', 'SEVERITY_SCORE', 'SEVERITY', 'DATE', 'LATITUDE', 'LONGITUDE', 'CRIME_TYPE',
+    'IS_RED_ZONE', 'IS_ORANGE_ZONE', 'IS_YELLOW_ZONE', 'IS_GREEN_ZONE', 'IS_WHITE_ZONE', 'RISK_ZONE', 'SOURCE',
+    'RANK', 'HOUR', 'DAY_OF_WEEK', 'MONTH', 'YEAR', 'IS_PEAK_HOUR', 'IS_WEEKEND',
+]
+CHUNK_SIZE = 1_000_000
+START_DATE, END_DATE = '2020-01-01', '2025-12-31'
+
+# Town centroids (lat, lon) and relative incident volume; volumes of the twelve towns in
+# data-processed/03_03_top_towns_per_cluster.csv follow the real extract
+TOWNS = {
+    'Lyari Town': (24.868, 66.995, 11149),
+    'Orangi Town': (24.951, 66.998, 9508),
+    'Korangi Town': (24.834, 67.131, 8354),
+    'Landhi Town': (24.852, 67.203, 8124),
+    'Gulshan-e-Iqbal Town': (24.921, 67.094, 6974),
+    'Saddar Town': (24.856, 67.025, 6728),
+    'Gulberg Town': (24.934, 67.074, 5810),
+    'Baldia Town': (24.921, 66.965, 5686),
+    'Jamshed Town': (24.877, 67.046, 5104),
+    'Shah Faisal Town': (24.879, 67.157, 3964),
+    'Gadap Town': (25.032, 67.150, 3819),
+    'SITE Town': (24.900, 66.996, 3330),
+    'North Nazimabad Town': (24.941, 67.039, 3100),
+    'New Karachi Town': (24.986, 67.066, 2900),
+    'Liaquatabad Town': (24.905, 67.046, 2700),
+    'Malir Town': (24.895, 67.206, 2500),
+    'Kemari Town': (24.835, 66.975, 2100),
+    'Bin Qasim Town': (24.800, 67.330, 1500),
+}
+
+# Crime type -> (share of incidents, P(High), P(Medium), P(Low))
+CRIME_TYPES = {
+    'Mobile Snatching': (0.22, 0.10, 0.50, 0.40),
+    'Street Robbery': (0.15, 0.30, 0.50, 0.20),
+    'Vehicle Theft': (0.14, 0.05, 0.45, 0.50),
+    'Theft': (0.12, 0.02, 0.28, 0.70),
+    'Burglary': (0.10, 0.10, 0.50, 0.40),
+    'Assault': (0.08, 0.35, 0.45, 0.20),
+    'Fraud': (0.06, 0.05, 0.35, 0.60),
+    'Extortion': (0.04, 0.50, 0.40, 0.10),
+    'Drug Trafficking': (0.04, 0.40, 0.40, 0.20),
+    'Murder': (0.03, 0.95, 0.05, 0.00),
+    'Kidnapping': (0.02, 0.80, 0.20, 0.00),
+}
+SEVERITIES = ['High', 'Medium', 'Low']
+SEVERITY_SCORES = {'High': (7, 10), 'Medium': (4, 6), 'Low': (1, 3)}  # inclusive score range per level
+SOURCES = {'FIR': 0.6, 'CPLC': 0.3, 'Media Report': 0.1}
+ZONES = ['Red', 'Orange', 'Yellow', 'Green', 'White']
+ZONE_SHARES = [0.10, 0.20, 0.30, 0.25, 0.15]  # subdivisions per zone, most incidents first
+
+# Incidents per hour of day: quiet early morning, busy afternoon, peak 17:00-20:00
+HOUR_WEIGHTS = np.array([3, 2, 1.5, 1, 1, 1, 1.5, 2, 3, 3.5, 4, 4.5, 5, 5, 5, 5.5, 6, 7.5, 8, 8, 7.5, 6, 5, 4])
+
+
+def _risk_levels(weights):
+    ranks = pd.Series(weights).rank(pct=True, method='first').to_numpy()
+    return np.where(ranks > 2 / 3, 'High', np.where(ranks > 1 / 3, 'Medium', 'Low'))
+
+
+def _priority_ranks(weights):
+    return pd.Series(weights).rank(ascending=False, method='first').to_numpy().astype(np.int64)
+
+
+# Fixed map of the city for a seed: subdivisions with their centre, a hotspot, their share of
+# incidents, risk attributes and their own crime-type mix. Every chunk samples from this table.
+def city_layout(seed=42):
+    rng = np.random.default_rng(seed)
+    town_names = list(TOWNS)
+    town_weights = np.array([TOWNS[t][2] for t in town_names], dtype=np.float64)
+    town_levels = _risk_levels(town_weights)
+    town_ranks = _priority_ranks(town_weights)
+    type_shares = np.array([spec[0] for spec in CRIME_TYPES.values()])
+
+    rows = []
+    for t, town in enumerate(town_names):
+        lat, lon, _ = TOWNS[town]
+        n_sub = int(rng.integers(6, 15))
+        shares = rng.dirichlet(np.full(n_sub, 1.5))  # a few busy subdivisions per town
+        centres = rng.normal([lat, lon], 0.012, size=(n_sub, 2))
+        for s in range(n_sub):
+            rows.append({
+                'TOWN': town,
+                'TOWN_RISK_LEVEL': town_levels[t],
+                'TOWN_PRIORITY_RANK': town_ranks[t],
+                'SUBDIVISION': f"{town.removesuffix(' Town')} Sector {s + 1}",
+                'weight': town_weights[t] / town_weights.sum() * shares[s],
+                'lat': centres[s, 0],
+                'lon': centres[s, 1],
+                'hot_lat': centres[s, 0] + rng.normal(0, 0.004),
+                'hot_lon': centres[s, 1] + rng.normal(0, 0.004),
+                'crime_mix': rng.dirichlet(type_shares * 200),  # town-specific mix around the city-wide shares
+            })
+
+    layout = pd.DataFrame(rows)
+    layout['weight'] /= layout['weight'].sum()
+    layout['SUBDIVISION_RISK_LEVEL'] = _risk_levels(layout['weight'])
+    layout['SUBDIVISION_PRIORITY_RANK'] = layout.groupby('TOWN')['weight'].rank(ascending=False, method='first').astype(np.int64)
+    layout['RANK'] = _priority_ranks(layout['weight'])
+
+    zone_bounds = np.cumsum(ZONE_SHARES) * len(layout)
+    layout['RISK_ZONE'] = np.array(ZONES)[np.searchsorted(zone_bounds, layout['RANK'] - 1, side='right').clip(0, len(ZONES) - 1)]
+    return layout
+
+
+# Day weights over the date range: slow growth over the years, a summer peak and quieter weekends
+def _day_weights(days):
+    years = (days - days[0]).days.to_numpy() / 365.25
+    season = 1 + 0.15 * np.sin(2 * np.pi * (days.dayofyear.to_numpy() - 80) / 365.25)
+    weekend = np.where(days.dayofweek.to_numpy() >= 5, 0.9, 1.0)
+    weights = (1 + 0.08 * years) * season * weekend
+    return weights / weights.sum()
+
+
+# One chunk of synthetic incidents in the temp_crime_data schema. `first_id` numbers the incidents;
+# duplicate_rate / missing_rate copy earlier rows and blank out values, for the cleaning step.
+def generate_incidents(n_rows, layout, rng, first_id=0, duplicate_rate=0.0, missing_rate=0.0):
+    sub = rng.choice(len(layout), size=n_rows, p=layout['weight'].to_numpy())
+    mixes = np.stack(layout['crime_mix'].to_numpy())
+    # Crime type per row from its subdivision's mix (inverse CDF, one uniform draw per row)
+    crime = (rng.random(n_rows)[:, None] > np.cumsum(mixes, axis=1)[sub]).sum(axis=1).clip(0, len(CRIME_TYPES) - 1)
+
+    severity_probs = np.array([spec[1:] for spec in CRIME_TYPES.values()])
+    severity = (rng.random(n_rows)[:, None] > np.cumsum(severity_probs, axis=1)[crime]).sum(axis=1).clip(0, 2)
+    low = np.array([SEVERITY_SCORES[s][0] for s in SEVERITIES])[severity]
+    high = np.array([SEVERITY_SCORES[s][1] for s in SEVERITIES])[severity]
+
+    # Most incidents spread around the subdivision centre, the rest concentrated on its hotspot
+    hot = rng.random(n_rows) < 0.3
+    centre = np.where(hot[:, None], layout[['hot_lat', 'hot_lon']].to_numpy()[sub], layout[['lat', 'lon']].to_numpy()[sub])
+    spread = np.where(hot, 0.0015, 0.006)[:, None]
+    coords = centre + rng.normal(size=(n_rows, 2)) * spread
+
+    days = pd.date_range(START_DATE, END_DATE, freq='D')
+    day = rng.choice(len(days), size=n_rows, p=_day_weights(days))
+    dates = days[day]
+    hours = rng.choice(24, size=n_rows, p=HOUR_WEIGHTS / HOUR_WEIGHTS.sum())
+    zones = layout['RISK_ZONE'].to_numpy()[sub]
+
+    df = pd.DataFrame({
+        'INCIDENT_ID': np.char.mod('KHI-%09d', np.arange(first_id, first_id + n_rows)),
+        'TOWN': layout['TOWN'].to_numpy()[sub],
+        'TOWN_RISK_LEVEL': layout['TOWN_RISK_LEVEL'].to_numpy()[sub],
+        'TOWN_PRIORITY_RANK': layout['TOWN_PRIORITY_RANK'].to_numpy()[sub],
+        'SUBDIVISION': layout['SUBDIVISION'].to_numpy()[sub],
+        'SUBDIVISION_RISK_LEVEL': layout['SUBDIVISION_RISK_LEVEL'].to_numpy()[sub],
+        'SUBDIVISION_PRIORITY_RANK': layout['SUBDIVISION_PRIORITY_RANK'].to_numpy()[sub],
+        'SEVERITY_SCORE': rng.integers(low, high + 1),
+        'SEVERITY': np.array(SEVERITIES)[severity],
+        'DATE': days.strftime('%Y-%m-%d').to_numpy()[day],  # formatted once per day, not per row
+        'LATITUDE': coords[:, 0].round(6),
+        'LONGITUDE': coords[:, 1].round(6),
+        'CRIME_TYPE': np.array(list(CRIME_TYPES))[crime],
+        **{f'IS_{zone.upper()}_ZONE': zones == zone for zone in ZONES},
+        'RISK_ZONE': zones,
+        'SOURCE': rng.choice(list(SOURCES), size=n_rows, p=list(SOURCES.values())),
+        'RANK': layout['RANK'].to_numpy()[sub],
+        'HOUR': hours,
+        # Same derivation as feature_store.add_temporal_features
+        'DAY_OF_WEEK': dates.dayofweek,
+        'MONTH': dates.month,
+        'YEAR': dates.year,
+        'IS_PEAK_HOUR': ((hours >= 17) & (hours <= 20)).astype(np.int64),
+        'IS_WEEKEND': (dates.dayofweek >= 5).astype(np.int64),
+    })
+
+    if duplicate_rate:
+        dup = rng.random(n_rows) < duplicate_rate
+        dup[0] = False
+        rows = np.arange(n_rows)
+        rows[dup] = (rng.random(int(dup.sum())) * rows[dup]).astype(np.int64)  # copy of an earlier row
+        df = df.take(rows).reset_index(drop=True)
+    if missing_rate:
+        for col in ['SUBDIVISION', 'CRIME_TYPE', 'LATITUDE']:
+            df.loc[rng.random(n_rows) < missing_rate / 3, col] = None
+    return df
+
+
+# Write n_rows synthetic incidents to a .csv (raw extract, what notebook 02 reads) or .parquet file,
+# chunk by chunk so memory stays bounded at any size. Output is reproducible for a given seed and chunk size.
+def write_synthetic(path, n_rows, seed=42, chunk_size=CHUNK_SIZE, duplicate_rate=0.0, missing_rate=0.0):
+    layout = city_layout(seed)
+    as_parquet = path.endswith('.parquet')
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    writer = None
+    try:
+        for i, lo in enumerate(range(0, n_rows, chunk_size)):
+            rng = np.random.default_rng([seed, i])
+            chunk = generate_incidents(min(chunk_size, n_rows - lo), layout, rng, lo, duplicate_rate, missing_rate)
+            if as_parquet:
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(tmp_path, table.schema, compression='zstd')
+                writer.write_table(table.cast(writer.schema))
+            else:
+                chunk.to_csv(tmp_path, mode='w' if i == 0 else 'a', header=i == 0, index=False)
+    finally:
+        if writer is not None:
+            writer.close()
+    os.replace(tmp_path, path)
+    return path
+
+
+# "1M" -> 1_000_000, "250k" -> 250_000, "100000" -> 100000
+def parse_rows(text):
+    text = str(text).strip().lower().replace('_', '')
+    scale = {'k': 1_000, 'm': 1_000_000, 'b': 1_000_000_000}.get(text[-1:], 1)
+    return int(float(text[:-1] if scale > 1 else text) * scale)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate synthetic Karachi crime incidents (temp_crime_data schema)")
+    parser.add_argument("output_path", help=".csv or .parquet")
+    parser.add_argument("--rows", default="1M", help="number of incidents, e.g. 1M, 10M, 100M")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--duplicate-rate", type=float, default=0.0)
+    parser.add_argument("--missing-rate", type=float, default=0.0)
+    args = parser.parse_args()
+    print(write_synthetic(args.output_path, parse_rows(args.rows), args.seed, args.chunk_size,
+                          args.duplicate_rate, args.missing_rate))
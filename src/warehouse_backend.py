@@ -0,0 +1,160 @@
+import os
+import threading
+import time
+
+import supabase_connection
+from config import CLEANED, FEATURE_STORE
+from feature_store import DERIVED_FEATURES, KEY, FeatureStore
+from instrumentation import step
+from supabase_connection import check_filters
+from warehouse_loader import create_embedded_schema, load_artifact
+from warehouse_rollups import create_rollups
+
+BACKEND = os.getenv("CRIME_WAREHOUSE_BACKEND", "supabase")  # "supabase" or "local"
+SOURCE_PATH = os.getenv("CRIME_WAREHOUSE_SOURCE", CLEANED)
+LOCAL_DB_PATH = os.getenv("CRIME_WAREHOUSE_DB", ":memory:")  # a file keeps the local warehouse between runs
+
+
+# Live warehouse: paged, cached reads through the shared Supabase client
+class SupabaseBackend:
+    name = "supabase"
+
+    def fetch_table(self, table_name, limit=None, order_by=None, stats=None, **kwargs):
+        return supabase_connection.fetch_table(table_name, limit=limit, order_by=order_by, stats=stats, **kwargs)
+
+    def count_by(self, table_name, group_by, filters=None, **kwargs):
+        return supabase_connection.count_by(table_name, group_by, filters, **kwargs)
+
+
+SQL_OPS = {"eq": "=", "neq": "<>", "gt": ">", "gte": ">=", "lt": "<", "lte": "<="}
+
+
+def _identifier(name):
+    if not name.isidentifier():
+        raise ValueError(f"Invalid table or column name: {name!r}")
+    return f'"{name}"'
+
+
+# Quoted SQL string literal (file paths in the read_* table functions, which take no placeholders)
+def _literal(value):
+    return value.replace("'", "''")
+
+
+# WHERE clause with ? placeholders for (column, op, value) filters
+def _where(filters):
+    conditions, values = [], []
+    for column, op, value in check_filters(filters):
+        if op == "in":
+            value = list(value)
+            conditions.append(f"{_identifier(column)} IN ({', '.join('?' for _ in value)})" if value else "FALSE")
+            values.extend(value)
+        else:
+            conditions.append(f"{_identifier(column)} {SQL_OPS[op]} ?")
+            values.append(value)
+    return (" WHERE " + " AND ".join(conditions) if conditions else ""), values
+
+
+# Offline warehouse: the same star schema, rollups and views in an embedded DuckDB database, built
+# from the processed cleaned artifact on first use. Reopening a file database only loads new incidents.
+# The artifact itself, joined with its derived temporal features from the feature store, is exposed
+# as temp_crime_data, like the staging table in Supabase.
+class LocalBackend:
+    name = "local"
+
+    def __init__(self, source_path=SOURCE_PATH, db_path=LOCAL_DB_PATH, feature_store_path=FEATURE_STORE):
+        self.source_path = source_path
+        self.db_path = db_path
+        self.feature_store_path = feature_store_path
+        self.load_stats = None
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def connect(self):
+        if self._conn is None:
+            with self._lock:
+                if self._conn is None:
+                    import duckdb
+
+                    conn = duckdb.connect(self.db_path)
+                    create_embedded_schema(conn)
+                    create_rollups(conn)
+                    self.load_stats = load_artifact(conn, self.source_path, feature_store_path=self.feature_store_path)
+                    reader = "read_parquet" if self.source_path.endswith(".parquet") else "read_csv_auto"
+                    source = f"{reader}('{_literal(self.source_path)}')"
+                    parts = FeatureStore(self.feature_store_path).parts_glob()
+                    if parts is not None:
+                        derived = ", ".join(DERIVED_FEATURES)
+                        source = (f"{source} LEFT JOIN (SELECT {KEY}, {derived} FROM read_parquet('{_literal(parts)}')) "
+                                  f"USING ({KEY})")
+                    conn.execute(f"CREATE OR REPLACE VIEW temp_crime_data AS SELECT * FROM {source}")
+                    self._conn = conn
+        return self._conn
+
+    def _query(self, sql, values=()):
+        return self.connect().cursor().execute(sql, values).df()  # one cursor per call, safe across threads
+
+    def fetch_table(self, table_name, limit=None, order_by=None, stats=None, columns=None, filters=None,
+                    descending=False, **kwargs):
+        # kwargs (page_size, max_workers, use_cache) only apply to the Supabase backend
+        projection = ", ".join(_identifier(c) for c in columns) if columns else "*"
+        where, values = _where(filters)
+        sql = f"SELECT {projection} FROM {_identifier(table_name)}{where}"
+        if order_by:
+            sql += f" ORDER BY {_identifier(order_by)}{' DESC' if descending else ''}"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+
+        start = time.perf_counter()
+        df = self._query(sql, values)
+        if stats is not None:
+            stats.update(table=table_name, rows=len(df), pages=1, total_rows=len(df), cached=False,
+                         seconds=time.perf_counter() - start)
+        return df
+
+    def count_by(self, table_name, group_by, filters=None, **kwargs):
+        keys = ", ".join(_identifier(c) for c in group_by)
+        where, values = _where(filters)
+        select = f"{keys}, " if keys else ""
+        group = f" GROUP BY {keys} ORDER BY {keys}" if keys else ""
+        return self._query(f"SELECT {select}COUNT(*) AS crime_count FROM {_identifier(table_name)}{where}{group}", values)
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+_BACKENDS = {"supabase": SupabaseBackend, "local": LocalBackend}
+_backend = None
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        if BACKEND not in _BACKENDS:
+            raise ValueError(f"Unknown CRIME_WAREHOUSE_BACKEND {BACKEND!r}, expected one of {sorted(_BACKENDS)}")
+        _backend = _BACKENDS[BACKEND]()
+    return _backend
+
+
+# Swap the backend at runtime, e.g. set_backend(LocalBackend("data.parquet")) in tests
+def set_backend(backend):
+    global _backend
+    _backend = _BACKENDS[backend]() if isinstance(backend, str) else backend
+    return _backend
+
+
+def fetch_table(table_name, limit=None, order_by=None, stats=None, **kwargs):
+    backend = get_backend()
+    with step("warehouse.fetch_table", table=table_name, backend=backend.name) as s:
+        df = backend.fetch_table(table_name, limit=limit, order_by=order_by, stats=stats, **kwargs)
+        s.rows = len(df)
+    return df
+
+
+def count_by(table_name, group_by, filters=None, **kwargs):
+    backend = get_backend()
+    with step("warehouse.count_by", table=table_name, backend=backend.name) as s:
+        df = backend.count_by(table_name, list(group_by), filters, **kwargs)
+        s.rows = len(df)
+    return df
@@ -0,0 +1,239 @@
+import io
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from config import FEATURE_STORE
+from feature_store import DERIVED_FEATURES, FeatureStore
+from instrumentation import instrumented
+from result_cache import cache
+from storage import read_artifact
+from warehouse_rollups import create_rollups, refresh_rollups
+
+# Natural keys of each dimension; the fact load joins on exactly these columns, so every
+# incident maps to one member of each dimension (no fan-out)
+DIMENSIONS = {
+    'time_dim': {
+        'id': 'time_id',
+        'key': ['date', 'hour'],
+        'attributes': ['day_of_week', 'month', 'year', 'is_peak_hour', 'is_weekend'],
+        'source': {'date': 'DATE', 'hour': 'HOUR', 'day_of_week': 'DAY_OF_WEEK', 'month': 'MONTH',
+                   'year': 'YEAR', 'is_peak_hour': 'IS_PEAK_HOUR', 'is_weekend': 'IS_WEEKEND'},
+    },
+    'location_dim': {
+        'id': 'location_id',
+        'key': ['town', 'subdivision', 'latitude', 'longitude', 'risk_zone'],
+        'attributes': [],
+        'source': {'town': 'TOWN', 'subdivision': 'SUBDIVISION', 'latitude': 'LATITUDE',
+                   'longitude': 'LONGITUDE', 'risk_zone': 'RISK_ZONE'},
+    },
+    'crimetype_dim': {
+        'id': 'crimetype_id',
+        'key': ['crime_type', 'severity'],
+        'attributes': [],
+        'source': {'crime_type': 'CRIME_TYPE', 'severity': 'SEVERITY'},
+    },
+}
+FACT_COLUMNS = ['crime_fact_id', 'incident_id', 'time_id', 'location_id', 'crimetype_id', 'severity_score',
+                'is_peak_hour', 'is_weekend', 'zone_indicator', 'cluster_label']
+SOURCE_COLUMNS = ['INCIDENT_ID', 'SEVERITY_SCORE'] + sorted({col for dim in DIMENSIONS.values() for col in dim['source'].values()})
+
+# Star schema for embedded backends (SQLite / DuckDB); mirrors sql/crime_data_warehouse_setup.sql
+EMBEDDED_SCHEMA = """
+CREATE TABLE IF NOT EXISTS time_dim (
+    time_id INTEGER PRIMARY KEY, date DATE NOT NULL, hour INTEGER, day_of_week INTEGER, month INTEGER,
+    year INTEGER, is_peak_hour BOOLEAN, is_weekend BOOLEAN
+);
+CREATE TABLE IF NOT EXISTS location_dim (
+    location_id INTEGER PRIMARY KEY, town VARCHAR(100) NOT NULL, subdivision VARCHAR(100),
+    latitude DOUBLE PRECISION, longitude DOUBLE PRECISION, risk_zone VARCHAR(10)
+);
+CREATE TABLE IF NOT EXISTS crimetype_dim (
+    crimetype_id INTEGER PRIMARY KEY, crime_type VARCHAR(100) NOT NULL, severity VARCHAR(10)
+);
+CREATE TABLE IF NOT EXISTS crime_fact (
+    crime_fact_id INTEGER PRIMARY KEY, incident_id VARCHAR(100) UNIQUE,
+    time_id INTEGER REFERENCES time_dim(time_id), location_id INTEGER REFERENCES location_dim(location_id),
+    crimetype_id INTEGER REFERENCES crimetype_dim(crimetype_id), severity_score INTEGER,
+    is_peak_hour BOOLEAN, is_weekend BOOLEAN, zone_indicator VARCHAR(10), cluster_label INTEGER
+);
+"""
+
+
+def backend_of(conn):
+    module = type(conn).__module__.split('.')[0]
+    if module in ('psycopg', 'psycopg2'):
+        return 'postgres'
+    if module in ('sqlite3', 'duckdb', '_duckdb'):
+        return 'duckdb' if 'duckdb' in module else 'sqlite'
+    raise ValueError(f"Unsupported connection type: {type(conn)}")
+
+
+def create_embedded_schema(conn):
+    for statement in EMBEDDED_SCHEMA.split(';'):
+        if statement.strip():
+            conn.execute(statement)
+
+
+def _query_df(conn, sql):
+    cur = conn.cursor()
+    cur.execute(sql)
+    columns = [desc[0].lower() for desc in cur.description]
+    return pd.DataFrame(cur.fetchall(), columns=columns)
+
+
+# Key columns in one canonical form so values read back from any backend match the incoming ones
+def _normalize_keys(df, key):
+    out = df[key].copy()
+    for col in key:
+        if col == 'date':
+            out[col] = pd.to_datetime(out[col]).dt.strftime('%Y-%m-%d')
+        elif col in ('latitude', 'longitude'):
+            out[col] = out[col].astype(np.float64)
+        elif col == 'hour':
+            out[col] = out[col].astype(np.int64)
+        else:
+            out[col] = out[col].astype(str)
+    return out
+
+
+# Bulk insert a DataFrame: COPY on PostgreSQL, a registered DataFrame on DuckDB, executemany on SQLite
+def bulk_insert(conn, table, df):
+    if df.empty:
+        return
+    backend = backend_of(conn)
+    columns = ', '.join(df.columns)
+    if backend == 'postgres':
+        buffer = io.StringIO()
+        df.to_csv(buffer, index=False, header=False)
+        buffer.seek(0)
+        cur = conn.cursor()
+        sql = f"COPY {table} ({columns}) FROM STDIN WITH (FORMAT csv)"
+        if hasattr(cur, 'copy'):  # psycopg 3
+            with cur.copy(sql) as copy:
+                copy.write(buffer.read())
+        else:  # psycopg2
+            cur.copy_expert(sql, buffer)
+    elif backend == 'duckdb':
+        conn.register('_bulk_rows', df)
+        conn.execute(f"INSERT INTO {table} ({columns}) SELECT {columns} FROM _bulk_rows")
+        conn.unregister('_bulk_rows')
+    else:
+        placeholders = ', '.join('?' for _ in df.columns)
+        rows = df.astype(object).where(df.notna(), None).itertuples(index=False, name=None)
+        conn.executemany(f"INSERT INTO {table} ({columns}) VALUES ({placeholders})", rows)
+
+
+# SERIAL sequences are not advanced by explicit ids; keep them in step for later SQL inserts
+def _sync_sequence(conn, table, id_col):
+    if backend_of(conn) == 'postgres':
+        conn.cursor().execute(
+            f"SELECT setval(pg_get_serial_sequence('{table}', '{id_col}'), COALESCE((SELECT MAX({id_col}) FROM {table}), 1))"
+        )
+
+
+# DuckDB connections autocommit each statement; open a transaction so dimension members and their
+# facts are committed together (SQLite and PostgreSQL drivers open one implicitly on the first insert)
+def _begin(conn):
+    if backend_of(conn) == 'duckdb':
+        conn.begin()
+
+
+# Assign surrogate keys in memory: existing members keep their ids, new members get max(id)+1...
+# Returns the incidents' surrogate ids and the number of new members inserted.
+def _load_dimension(conn, table, spec, incidents):
+    key, id_col = spec['key'], spec['id']
+    members = incidents[[spec['source'][col] for col in key + spec['attributes']]].copy()
+    members.columns = key + spec['attributes']
+    incident_keys = _normalize_keys(members, key)
+
+    existing = _query_df(conn, f"SELECT {id_col}, {', '.join(key)} FROM {table}")
+    existing_keys = _normalize_keys(existing, key)
+    existing_keys[id_col] = existing[id_col].to_numpy()
+
+    # Dictionary-encode the incoming keys, then look the distinct ones up among existing members
+    codes = incident_keys.groupby(key, sort=False).ngroup().to_numpy()
+    first_row = incident_keys.drop_duplicates().index.to_numpy()  # same order as the codes
+    distinct = incident_keys.iloc[first_row].merge(existing_keys, on=key, how='left')
+
+    is_new = distinct[id_col].isna().to_numpy()
+    next_id = int(existing[id_col].max()) + 1 if len(existing) else 1
+    distinct.loc[is_new, id_col] = np.arange(next_id, next_id + is_new.sum())
+    ids = distinct[id_col].to_numpy(dtype=np.int64)
+
+    if is_new.any():
+        new_rows = members.iloc[first_row[is_new]].copy()
+        new_rows.insert(0, id_col, ids[is_new])
+        if 'date' in new_rows:
+            new_rows['date'] = incident_keys['date'].iloc[first_row[is_new]].to_numpy()
+        for col in ('is_peak_hour', 'is_weekend'):
+            if col in new_rows:
+                new_rows[col] = new_rows[col].astype(bool)
+        bulk_insert(conn, table, new_rows)
+        _sync_sequence(conn, table, id_col)
+
+    return ids[codes], int(is_new.sum())
+
+
+# Idempotent, incremental load of cleaned incidents into the star schema: incidents already in
+# crime_fact (by incident_id) are skipped and only new dimension members are inserted
+@instrumented('warehouse_loader.load_incidents', rows='incidents')
+def load_incidents(conn, incidents, cluster_labels=None):
+    start = time.perf_counter()
+    stats = {'incidents': len(incidents)}
+
+    existing_ids = set(_query_df(conn, "SELECT incident_id FROM crime_fact")['incident_id'].astype(str))
+    incident_ids = incidents['INCIDENT_ID'].astype(str)
+    new = ~incident_ids.isin(existing_ids) & ~incident_ids.duplicated()
+    incidents = incidents[new.to_numpy()].reset_index(drop=True)
+    if cluster_labels is not None:
+        cluster_labels = np.asarray(cluster_labels)[new.to_numpy()]
+    stats['new_incidents'] = len(incidents)
+    if incidents.empty:
+        stats['seconds'] = time.perf_counter() - start
+        return stats
+
+    _begin(conn)
+    try:
+        fact = pd.DataFrame({'incident_id': incidents['INCIDENT_ID'].astype(str)})
+        for table, spec in DIMENSIONS.items():
+            fact[spec['id']], stats[f'new_{table}'] = _load_dimension(conn, table, spec, incidents)
+
+        next_fact_id = _query_df(conn, "SELECT COALESCE(MAX(crime_fact_id), 0) AS m FROM crime_fact")['m'].iloc[0]
+        fact.insert(0, 'crime_fact_id', np.arange(int(next_fact_id) + 1, int(next_fact_id) + 1 + len(fact)))
+        fact['severity_score'] = incidents['SEVERITY_SCORE'].astype(np.int64)
+        fact['is_peak_hour'] = incidents['IS_PEAK_HOUR'].astype(bool)
+        fact['is_weekend'] = incidents['IS_WEEKEND'].astype(bool)
+        fact['zone_indicator'] = incidents['RISK_ZONE'].astype(str)
+        fact['cluster_label'] = pd.array(cluster_labels, dtype='Int64') if cluster_labels is not None else pd.array([None] * len(fact), dtype='Int64')
+
+        bulk_insert(conn, 'crime_fact', fact[FACT_COLUMNS])
+        _sync_sequence(conn, 'crime_fact', 'crime_fact_id')
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+    stats['seconds'] = time.perf_counter() - start
+    return stats
+
+
+# Load a cleaned artifact, with its derived temporal features from the feature store, and fold the
+# new facts into the rollup tables; cached query results are dropped as they predate the load
+def load_artifact(conn, cleaned_path, refresh=True, feature_store_path=FEATURE_STORE):
+    incidents = read_artifact(cleaned_path, columns=[col for col in SOURCE_COLUMNS if col not in DERIVED_FEATURES])
+    stats = load_incidents(conn, FeatureStore(feature_store_path).attach(incidents, DERIVED_FEATURES))
+    if refresh:
+        stats['rollups'] = refresh_rollups(conn)
+    cache.invalidate()
+    return stats
+
+
+if __name__ == "__main__":
+    import duckdb
+    # python warehouse_loader.py <cleaned artifact> <local .duckdb file> [feature store]
+    connection = duckdb.connect(sys.argv[2])
+    create_embedded_schema(connection)
+    create_rollups(connection)
+    print(load_artifact(connection, sys.argv[1], feature_store_path=sys.argv[3] if len(sys.argv) > 3 else FEATURE_STORE))
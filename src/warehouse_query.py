@@ -0,0 +1,67 @@
+import warehouse_backend
+
+
+# Chainable query on a warehouse table or view; projection, filters, ordering and group-by counts
+# run in the database, so only the selected columns and matching rows (or the counts) are returned.
+#   Query("temp_crime_data").select("TOWN", "DATE").eq("SEVERITY", "High").between("YEAR", 2024, 2024).fetch()
+#   Query("temp_crime_data").eq("YEAR", 2024).count_by("TOWN", "SEVERITY")
+class Query:
+    def __init__(self, table_name):
+        self.table_name = table_name
+        self.columns = None
+        self.filters = []
+        self.order_by = None
+        self.descending = False
+        self.row_limit = None
+
+    def _filter(self, column, op, value):
+        self.filters.append((column, op, value))
+        return self
+
+    def select(self, *columns):
+        self.columns = list(columns)
+        return self
+
+    def eq(self, column, value):
+        return self._filter(column, "eq", value)
+
+    def neq(self, column, value):
+        return self._filter(column, "neq", value)
+
+    def gt(self, column, value):
+        return self._filter(column, "gt", value)
+
+    def gte(self, column, value):
+        return self._filter(column, "gte", value)
+
+    def lt(self, column, value):
+        return self._filter(column, "lt", value)
+
+    def lte(self, column, value):
+        return self._filter(column, "lte", value)
+
+    # Inclusive range
+    def between(self, column, low, high):
+        return self.gte(column, low).lte(column, high)
+
+    def in_(self, column, values):
+        return self._filter(column, "in", list(values))
+
+    def order(self, column, descending=False):
+        self.order_by = column
+        self.descending = descending
+        return self
+
+    def limit(self, n):
+        self.row_limit = n
+        return self
+
+    def fetch(self, stats=None, **kwargs):
+        return warehouse_backend.fetch_table(
+            self.table_name, limit=self.row_limit, order_by=self.order_by, stats=stats,
+            columns=self.columns, filters=self.filters, descending=self.descending, **kwargs
+        )
+
+    # One row per group with its crime_count (columns, ordering and limit are not used)
+    def count_by(self, *group_by, **kwargs):
+        return warehouse_backend.count_by(self.table_name, group_by, self.filters, **kwargs)
@@ -0,0 +1,114 @@
+import time
+
+from instrumentation import instrumented
+
+# Aggregates behind the dashboard views, kept as small tables and refreshed from new fact rows only.
+# Each rollup is upserted with the counts of facts loaded since its watermark (last crime_fact_id
+# folded in), so reads never touch crime_fact and a refresh costs O(new facts).
+ROLLUPS = {
+    'rollup_monthly_crime_trends': {
+        'keys': ['year', 'month', 'severity'],
+        'columns': 'year INTEGER, month INTEGER, severity VARCHAR(10)',
+        'select': 't.year, t.month, c.severity',
+        'joins': 'JOIN time_dim t ON f.time_id = t.time_id JOIN crimetype_dim c ON f.crimetype_id = c.crimetype_id',
+        'where': '',
+    },
+    'rollup_high_severity_towns': {
+        'keys': ['town'],
+        'columns': 'town VARCHAR(100)',
+        'select': 'l.town',
+        'joins': 'JOIN location_dim l ON f.location_id = l.location_id JOIN crimetype_dim c ON f.crimetype_id = c.crimetype_id',
+        'where': "AND c.severity = 'High'",
+    },
+    'rollup_peak_hour_crimes': {
+        'keys': ['is_peak_hour'],
+        'columns': 'is_peak_hour BOOLEAN',
+        'select': 'f.is_peak_hour',
+        'joins': '',
+        'where': '',
+    },
+}
+
+# The dashboard views keep their names and columns but read the rollups
+VIEWS = {
+    'vw_monthly_crime_trends': """
+        SELECT year, month, severity, crime_count FROM rollup_monthly_crime_trends ORDER BY year, month""",
+    'vw_top_high_severity_towns': """
+        SELECT town, crime_count FROM rollup_high_severity_towns ORDER BY crime_count DESC LIMIT 10""",
+    'vw_peak_hour_crimes': """
+        SELECT is_peak_hour, crime_count FROM rollup_peak_hour_crimes""",
+}
+
+# Foreign keys of crime_fact (dimension joins and the delta scans)
+FACT_INDEXES = {
+    'idx_crime_fact_time_id': 'time_id',
+    'idx_crime_fact_location_id': 'location_id',
+    'idx_crime_fact_crimetype_id': 'crimetype_id',
+}
+
+
+# Open a transaction and return where to run its statements: a DuckDB cursor is a separate
+# connection that autocommits every statement, so DuckDB statements run on the connection itself
+def _transaction(conn):
+    from warehouse_loader import _begin, backend_of  # warehouse_loader imports this module
+
+    _begin(conn)
+    return conn if backend_of(conn) == 'duckdb' else conn.cursor()
+
+
+def create_rollups(conn):
+    cur = _transaction(conn)
+    try:
+        for name, column in FACT_INDEXES.items():
+            cur.execute(f"CREATE INDEX IF NOT EXISTS {name} ON crime_fact ({column})")
+        cur.execute("CREATE TABLE IF NOT EXISTS rollup_state (rollup VARCHAR(100) PRIMARY KEY, last_fact_id INTEGER NOT NULL)")
+        for table, spec in ROLLUPS.items():
+            cur.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} ({spec['columns']}, crime_count BIGINT NOT NULL, "
+                f"PRIMARY KEY ({', '.join(spec['keys'])}))"
+            )
+            cur.execute(f"INSERT INTO rollup_state (rollup, last_fact_id) SELECT '{table}', 0 "
+                        f"WHERE NOT EXISTS (SELECT 1 FROM rollup_state WHERE rollup = '{table}')")
+        for view, query in VIEWS.items():
+            cur.execute(f"DROP VIEW IF EXISTS {view}")
+            cur.execute(f"CREATE VIEW {view} AS {query}")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+
+# Fold facts loaded since the last refresh into every rollup (the first call builds them in full);
+# call after each load. All rollups and their watermarks are updated in one transaction.
+# Returns the number of new facts per rollup.
+@instrumented('warehouse_rollups.refresh_rollups', rows=None)
+def refresh_rollups(conn):
+    start = time.perf_counter()
+    cur = _transaction(conn)
+    stats = {}
+    try:
+        cur.execute("SELECT COALESCE(MAX(crime_fact_id), 0) FROM crime_fact")
+        upper = int(cur.fetchone()[0])  # facts loaded while refreshing are left for the next call
+        for table, spec in ROLLUPS.items():
+            cur.execute(f"SELECT last_fact_id FROM rollup_state WHERE rollup = '{table}'")
+            lower = int(cur.fetchone()[0])
+            if upper <= lower:
+                stats[table] = 0
+                continue
+            keys = ', '.join(spec['keys'])
+            cur.execute(f"""
+                INSERT INTO {table} ({keys}, crime_count)
+                SELECT {spec['select']}, COUNT(*)
+                FROM crime_fact f {spec['joins']}
+                WHERE f.crime_fact_id > {lower} AND f.crime_fact_id <= {upper} {spec['where']}
+                GROUP BY {spec['select']}
+                ON CONFLICT ({keys}) DO UPDATE SET crime_count = {table}.crime_count + excluded.crime_count
+            """)
+            cur.execute(f"UPDATE rollup_state SET last_fact_id = {upper} WHERE rollup = '{table}'")
+            stats[table] = upper - lower
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    stats['seconds'] = time.perf_counter() - start
+    return stats
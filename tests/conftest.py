@@ -0,0 +1,6 @@
+import os
+import sys
+
+# src/ modules import each other by plain name, as the notebooks do
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+os.environ.setdefault('CRIME_METRICS_LOG', 'off')
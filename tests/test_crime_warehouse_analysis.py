@@ -0,0 +1,39 @@
+import pandas as pd
+import pytest
+
+import crime_warehouse_analysis
+from crime_warehouse_analysis import _fetch_with_retry
+
+APIError = pytest.importorskip('postgrest.exceptions').APIError
+
+
+def _failing_fetch(errors):
+    calls = []
+
+    def fetch_table(view_name, stats=None):
+        calls.append(view_name)
+        if len(calls) <= len(errors):
+            raise errors[len(calls) - 1]
+        return pd.DataFrame({'crime_count': [1]})
+
+    return fetch_table, calls
+
+
+@pytest.mark.parametrize('code', [503, '429', '57014', 'PGRST002'])
+def test_transient_api_errors_are_retried(monkeypatch, code):
+    fetch_table, calls = _failing_fetch([APIError({'code': code, 'message': 'transient'})])
+    monkeypatch.setattr(crime_warehouse_analysis, 'fetch_table', fetch_table)
+
+    df, timing = _fetch_with_retry('vw_peak_hour_crimes', retries=2, backoff=0)
+
+    assert timing['attempts'] == 2 and len(df) == 1
+
+
+@pytest.mark.parametrize('code', ['42P01', 'PGRST301', 404, '401'])
+def test_other_api_errors_fail_on_the_first_attempt(monkeypatch, code):
+    fetch_table, calls = _failing_fetch([APIError({'code': code, 'message': 'permanent'})])
+    monkeypatch.setattr(crime_warehouse_analysis, 'fetch_table', fetch_table)
+
+    with pytest.raises(APIError):
+        _fetch_with_retry('vw_peak_hour_crimes', retries=2, backoff=0)
+    assert len(calls) == 1
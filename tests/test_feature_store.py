@@ -0,0 +1,30 @@
+import pandas as pd
+
+from feature_store import DERIVED_FEATURES, FeatureStore
+
+
+def _cleaned(ids, dates, hours):
+    return pd.DataFrame({'INCIDENT_ID': ids, 'DATE': pd.to_datetime(dates), 'HOUR': hours})
+
+
+def test_update_computes_features_for_new_incidents_only(tmp_path):
+    store = FeatureStore(str(tmp_path / 'features'))
+    assert store.update(_cleaned(['KHI-1', 'KHI-2'], ['2024-01-06', '2024-01-08'], [18, 9])) == 2
+    assert store.update(_cleaned(['KHI-2', 'KHI-3', 'KHI-3'], ['2024-01-08', '2024-01-09', '2024-01-09'],
+                                 [9, 19, 19])) == 1
+    assert store.update(_cleaned(['KHI-1'], ['2024-01-06'], [18])) == 0
+
+    assert sorted(store.known_ids()) == ['KHI-1', 'KHI-2', 'KHI-3']
+
+
+def test_attach_keeps_the_incidents_order(tmp_path):
+    store = FeatureStore(str(tmp_path / 'features'))
+    store.update(_cleaned(['KHI-1', 'KHI-2'], ['2024-01-06', '2024-01-08'], [18, 9]))
+    store.update(_cleaned(['KHI-3'], ['2024-01-09'], [19]))
+
+    incidents = store.attach(_cleaned(['KHI-3', 'KHI-1', 'KHI-2'], ['2024-01-09', '2024-01-06', '2024-01-08'],
+                                      [19, 18, 9]), DERIVED_FEATURES)
+
+    assert incidents['INCIDENT_ID'].tolist() == ['KHI-3', 'KHI-1', 'KHI-2']
+    assert incidents['IS_PEAK_HOUR'].tolist() == [1, 1, 0]
+    assert incidents['IS_WEEKEND'].tolist() == [0, 1, 0]  # 2024-01-06 is a Saturday
@@ -0,0 +1,39 @@
+import multiprocessing
+import os
+
+import pandas as pd
+import pytest
+
+import result_cache
+from result_cache import ResultCache
+
+
+def _put_tables(cache_dir, worker, n_tables):
+    cache = ResultCache(cache_dir=cache_dir)
+    for i in range(n_tables):
+        cache.put(f'vw_{worker}_{i}', pd.DataFrame({'crime_count': [i]}))
+
+
+@pytest.mark.skipif(result_cache.fcntl is None, reason='the index is locked across processes with flock')
+def test_concurrent_processes_keep_every_entry(tmp_path):
+    cache_dir = str(tmp_path / 'cache')
+    context = multiprocessing.get_context('fork')
+    workers = [context.Process(target=_put_tables, args=(cache_dir, worker, 10)) for worker in range(4)]
+    for process in workers:
+        process.start()
+    for process in workers:
+        process.join()
+
+    cache = ResultCache(cache_dir=cache_dir)
+    assert len(cache._load_index()) == 40
+    assert cache.get('vw_3_9')['crime_count'].tolist() == [9]
+
+
+def test_unindexed_result_files_are_evicted(tmp_path):
+    cache = ResultCache(cache_dir=str(tmp_path))
+    pd.DataFrame({'crime_count': [1]}).to_parquet(cache._path('vw_orphan-0123456789abcdef'))
+
+    cache.put('vw_peak_hour_crimes', pd.DataFrame({'crime_count': [2]}))
+
+    assert sorted(os.listdir(tmp_path)) == sorted(['index.json', 'index.json.lock',
+                                                   f"{cache.make_key('vw_peak_hour_crimes')}.parquet"])
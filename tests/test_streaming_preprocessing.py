@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from storage import read_artifact
+from streaming_preprocessing import FingerprintSet, preprocess_csv_in_chunks
+
+
+def _raw(rows):
+    return pd.DataFrame(rows, columns=['INCIDENT_ID', 'DATE', 'HOUR', 'TOWN', 'CRIME_TYPE'])
+
+
+def test_fingerprint_set_ignores_empty_batches():
+    seen = FingerprintSet()
+    seen.add(np.array([3, 1], dtype=np.uint64))
+    seen.add(np.array([], dtype=np.uint64))
+
+    assert seen.contains(np.array([1, 2, 3], dtype=np.uint64)).tolist() == [True, False, True]
+    assert len(seen) == 2
+
+
+@pytest.mark.parametrize('extension', ['parquet', 'csv'])
+def test_chunk_of_only_duplicates_followed_by_more_chunks(tmp_path, extension):
+    first = ['KHI-1', '2024-01-01', 18, 'Saddar Town', 'Theft'], ['KHI-2', '2024-01-02', 9, 'Lyari Town', 'Fraud']
+    raw = _raw([
+        *first,
+        *first,  # chunk 2: only duplicates of chunk 1
+        [None, None, None, None, None], [None, None, None, None, None],  # chunk 3: only missing values
+        ['KHI-3', '2024-01-06', 19, 'Saddar Town', 'Theft'], ['KHI-4', '2024-01-07', 2, 'Lyari Town', 'Theft'],
+    ])
+    raw_path, output_path = tmp_path / 'raw.csv', tmp_path / f'cleaned.{extension}'
+    raw.to_csv(raw_path, index=False)
+
+    stats = preprocess_csv_in_chunks(str(raw_path), str(output_path), chunk_size=2)
+
+    assert stats == {'rows_read': 8, 'rows_written': 4, 'dropped_missing': 2, 'dropped_duplicates': 2, 'chunks': 4}
+    cleaned = read_artifact(str(output_path)) if extension == 'parquet' else pd.read_csv(output_path)
+    assert cleaned['INCIDENT_ID'].astype(str).tolist() == ['KHI-1', 'KHI-2', 'KHI-3', 'KHI-4']
+    assert 'IS_PEAK_HOUR' not in cleaned  # derived features are computed into the feature store
@@ -0,0 +1,117 @@
+import sqlite3
+
+import pandas as pd
+import pytest
+
+import warehouse_loader
+from warehouse_loader import create_embedded_schema, load_incidents
+
+
+def _incidents(ids, crime_types=None):
+    n = len(ids)
+    return pd.DataFrame({
+        'INCIDENT_ID': ids,
+        'SEVERITY_SCORE': [3] * n,
+        'DATE': pd.to_datetime(['2024-01-01', '2024-01-01', '2024-01-02'] * (n // 3) + ['2024-01-03'] * (n % 3)),
+        'HOUR': [18] * n,
+        'DAY_OF_WEEK': [0] * n,
+        'MONTH': [1] * n,
+        'YEAR': [2024] * n,
+        'IS_PEAK_HOUR': [1] * n,
+        'IS_WEEKEND': [0] * n,
+        'TOWN': ['Saddar Town'] * n,
+        'SUBDIVISION': ['Saddar Sector 1'] * n,
+        # Same town / subdivision at two coordinates: a town-level join would fan out
+        'LATITUDE': [24.85 if i % 2 else 24.86 for i in range(n)],
+        'LONGITUDE': [67.02] * n,
+        'RISK_ZONE': ['Red'] * n,
+        'CRIME_TYPE': crime_types or ['Theft'] * n,
+        'SEVERITY': ['Low'] * n,
+    })
+
+
+@pytest.fixture(params=['duckdb', 'sqlite'])
+def conn(request):
+    if request.param == 'duckdb':
+        duckdb = pytest.importorskip('duckdb')
+        connection = duckdb.connect()
+    else:
+        connection = sqlite3.connect(':memory:')
+    create_embedded_schema(connection)
+    yield connection
+    connection.close()
+
+
+def _count(conn, table):
+    return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+def _facts(conn):
+    rows = conn.execute("""
+        SELECT f.incident_id, f.crime_fact_id, l.latitude, c.crime_type
+        FROM crime_fact f
+        JOIN time_dim t ON f.time_id = t.time_id
+        JOIN location_dim l ON f.location_id = l.location_id
+        JOIN crimetype_dim c ON f.crimetype_id = c.crimetype_id
+        ORDER BY f.incident_id
+    """).fetchall()
+    return pd.DataFrame(rows, columns=['incident_id', 'crime_fact_id', 'latitude', 'crime_type'])
+
+
+def test_surrogate_keys_and_no_fan_out(conn):
+    incidents = _incidents([f'KHI-{i}' for i in range(6)])
+    stats = load_incidents(conn, incidents)
+
+    assert stats['new_incidents'] == 6
+    assert stats['new_location_dim'] == 2 and stats['new_crimetype_dim'] == 1 and stats['new_time_dim'] == 2
+    assert sorted(r[0] for r in conn.execute("SELECT location_id FROM location_dim").fetchall()) == [1, 2]
+
+    facts = _facts(conn)
+    assert len(facts) == 6  # one fact per incident through every dimension join
+    assert facts['crime_fact_id'].is_unique
+    expected = incidents.set_index('INCIDENT_ID')['LATITUDE']
+    assert (facts.set_index('incident_id')['latitude'] == expected.loc[facts['incident_id']].to_numpy()).all()
+
+
+def test_reload_inserts_nothing(conn):
+    incidents = _incidents([f'KHI-{i}' for i in range(6)])
+    load_incidents(conn, incidents)
+    counts = {table: _count(conn, table) for table in ['crime_fact', *warehouse_loader.DIMENSIONS]}
+
+    stats = load_incidents(conn, incidents)
+
+    assert stats['new_incidents'] == 0
+    assert {table: _count(conn, table) for table in counts} == counts
+
+
+def test_incremental_load_adds_only_new_members(conn):
+    load_incidents(conn, _incidents([f'KHI-{i}' for i in range(6)]))
+    before = conn.execute("SELECT crimetype_id, crime_type FROM crimetype_dim").fetchall()
+
+    # Two known incidents, two new ones; one new crime type
+    batch = _incidents(['KHI-0', 'KHI-1', 'KHI-6', 'KHI-7'], crime_types=['Theft', 'Theft', 'Theft', 'Fraud'])
+    stats = load_incidents(conn, batch)
+
+    assert stats['new_incidents'] == 2
+    assert stats['new_crimetype_dim'] == 1
+    assert stats['new_location_dim'] == 0
+    after = conn.execute("SELECT crimetype_id, crime_type FROM crimetype_dim ORDER BY crimetype_id").fetchall()
+    assert after[:len(before)] == sorted(before)
+    assert after[-1] == (2, 'Fraud')
+    assert _count(conn, 'crime_fact') == 8
+
+
+def test_failed_load_leaves_no_dimension_rows(conn, monkeypatch):
+    bulk_insert = warehouse_loader.bulk_insert
+
+    def failing_insert(connection, table, df):
+        if table == 'crime_fact':
+            raise RuntimeError('fact insert failed')
+        bulk_insert(connection, table, df)
+
+    monkeypatch.setattr(warehouse_loader, 'bulk_insert', failing_insert)
+    with pytest.raises(RuntimeError):
+        load_incidents(conn, _incidents([f'KHI-{i}' for i in range(3)]))
+
+    for table in ['crime_fact', *warehouse_loader.DIMENSIONS]:
+        assert _count(conn, table) == 0
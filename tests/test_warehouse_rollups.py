@@ -0,0 +1,46 @@
+import pytest
+
+import warehouse_rollups
+from test_warehouse_loader import _incidents
+from warehouse_loader import create_embedded_schema, load_incidents
+from warehouse_rollups import create_rollups, refresh_rollups
+
+duckdb = pytest.importorskip('duckdb')
+
+
+@pytest.fixture
+def conn():
+    connection = duckdb.connect()
+    create_embedded_schema(connection)
+    create_rollups(connection)
+    yield connection
+    connection.close()
+
+
+def _snapshot(conn):
+    tables = ['rollup_state', *warehouse_rollups.ROLLUPS]
+    return {table: sorted(conn.execute(f"SELECT * FROM {table}").fetchall(), key=str) for table in tables}
+
+
+def test_refresh_folds_in_new_facts_only(conn):
+    load_incidents(conn, _incidents([f'KHI-{i}' for i in range(6)]))
+    assert refresh_rollups(conn)['rollup_monthly_crime_trends'] == 6
+
+    load_incidents(conn, _incidents(['KHI-6', 'KHI-7']))
+    assert refresh_rollups(conn)['rollup_monthly_crime_trends'] == 2
+    assert conn.execute("SELECT SUM(crime_count) FROM rollup_monthly_crime_trends").fetchone()[0] == 8
+
+
+def test_failed_refresh_changes_nothing(conn, monkeypatch):
+    load_incidents(conn, _incidents([f'KHI-{i}' for i in range(6)]))
+    refresh_rollups(conn)
+    load_incidents(conn, _incidents(['KHI-6', 'KHI-7']))
+    before = _snapshot(conn)
+
+    # The last rollup fails after the others have been upserted
+    broken = {**warehouse_rollups.ROLLUPS['rollup_peak_hour_crimes'], 'select': 'no_such_column'}
+    monkeypatch.setitem(warehouse_rollups.ROLLUPS, 'rollup_peak_hour_crimes', broken)
+    with pytest.raises(duckdb.BinderException):  # the real error, not a failed rollback
+        refresh_rollups(conn)
+
+    assert _snapshot(conn) == before